@@ -0,0 +1,257 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+import requests
+from bs4 import BeautifulSoup
+
+BASE_URL = "https://klavogonki.ru/vocs/"
+MAX_PAGES = 200
+PROFILE_ID_RE = re.compile(r'/profile/(\d+)')
+
+# Per kind: dataset counter that gates the crawl, and the order pages list items in.
+# Oldest-first lists resume from the last page seen, newest-first lists stop at the last item seen.
+TARGETS = {
+    'comments': {'counter': 'comments_count', 'newest_first': False},
+    'history': {'counter': 'history_count', 'newest_first': True},
+}
+
+
+def page_url(vocab_id: int, kind: str, page: int) -> str:
+    url = f"{BASE_URL}{vocab_id}/{kind}/"
+    return url if page == 1 else f"{url}?page={page}"
+
+
+def item_key(*parts) -> str:
+    data = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def parse_comments(html) -> List[Dict]:
+    """Comments in page order (same markup the userscript tooltip reads)."""
+    soup = BeautifulSoup(html, 'html.parser')
+    comments = []
+    for element in soup.select('.comment'):
+        info = element.select_one('.info')
+        author = info.select_one('.author .name') if info else None
+        date = info.select_one('.date') if info else None
+        if info:
+            info.extract()
+        text = element.get_text('\n', strip=True)
+        if not text:
+            continue
+        profile_id = PROFILE_ID_RE.search(author.get('href', '')) if author else None
+        comment = {
+            'author': author.get_text(strip=True) if author else None,
+            'author_id': int(profile_id.group(1)) if profile_id else None,
+            'date': date.get_text(strip=True) if date else None,
+            'text': text,
+        }
+        comment['key'] = item_key(comment['author_id'], comment['date'], text)
+        comments.append(comment)
+    return comments
+
+
+def parse_history(html) -> List[Dict]:
+    """Edit history rows in page order, kept as their cell texts."""
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = []
+    for row in soup.select('table tr'):
+        cells = [cell.get_text(' ', strip=True) for cell in row.find_all('td')]
+        if any(cells):
+            rows.append({'cells': cells, 'key': item_key(cells)})
+    return rows
+
+
+PARSERS = {'comments': parse_comments, 'history': parse_history}
+
+
+class ActivityCrawler:
+    """Incremental archive of vocabulary comments and edit history.
+
+    Every vocabulary keeps a cursor per kind: the counter value seen at the
+    last crawl plus where that crawl stopped. A vocabulary is only fetched
+    when the counter in the dataset differs from its cursor, and then only
+    the pages after the cursor. Items are appended to <kind>.jsonl and
+    cursors to cursors.jsonl (last line per vocabulary wins), so an
+    interrupted run loses at most the vocabulary in progress.
+    """
+    def __init__(self, directory: str, delay: float = 0.2):
+        self.directory = directory
+        self.delay = delay
+        os.makedirs(directory, exist_ok=True)
+        self.cursors_path = os.path.join(directory, 'cursors.jsonl')
+        self.cursors: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.requests = 0
+        self.load_cursors()
+
+    def load_cursors(self):
+        if os.path.exists(self.cursors_path):
+            with open(self.cursors_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.cursors[f"{entry['kind']}:{entry['id']}"] = entry
+
+    def compact_cursors(self):
+        """Rewrite cursors.jsonl with one line per vocabulary and kind."""
+        tmp_path = f"{self.cursors_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.cursors.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.cursors_path)
+
+    def cursor(self, vocab_id: int, kind: str) -> Dict:
+        return self.cursors.get(f"{kind}:{vocab_id}") or {
+            'id': vocab_id, 'kind': kind, 'count': 0, 'items': 0, 'page': 1, 'seen': []
+        }
+
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+            self.local.session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+        return self.local.session
+
+    def fetch(self, vocab_id: int, kind: str, page: int) -> List[Dict]:
+        response = self.session().get(page_url(vocab_id, kind, page), timeout=15)
+        with self.lock:
+            self.requests += 1
+        response.raise_for_status()
+        time.sleep(self.delay)
+        return PARSERS[kind](response.content)
+
+    def needs_crawl(self, vocab: Dict, kind: str) -> bool:
+        count = vocab.get(TARGETS[kind]['counter']) or 0
+        return count != self.cursor(vocab['id'], kind)['count']
+
+    def crawl(self, vocab_id: int, kind: str, count: int) -> int:
+        """Fetch the items added since the cursor; returns the number archived."""
+        cursor = self.cursor(vocab_id, kind)
+        seen = set(cursor['seen'])
+        new_items = []
+
+        if TARGETS[kind]['newest_first']:
+            # Walk from the newest page back to the newest item already archived
+            head = None
+            for page in range(1, MAX_PAGES + 1):
+                items = self.fetch(vocab_id, kind, page)
+                if not items:
+                    break
+                head = head or items[0]['key']
+                fresh = []
+                for item in items:
+                    if item['key'] in seen:
+                        break
+                    fresh.append(item)
+                new_items.extend(fresh)
+                if len(fresh) < len(items) or cursor['items'] + len(new_items) >= count:
+                    break
+            new_items.reverse()
+            page_keys = [head] if head else cursor['seen']
+            last_page = 1
+        else:
+            # Resume on the last page seen and read forward until pages stop adding items
+            last_page = page = cursor['page']
+            page_keys = cursor['seen']
+            while page <= MAX_PAGES:
+                items = self.fetch(vocab_id, kind, page)
+                fresh = [item for item in items if item['key'] not in seen]
+                if not fresh:
+                    if page == cursor['page'] and items:
+                        # The resume page was already full, new items start on the next one
+                        page += 1
+                        continue
+                    break
+                seen.update(item['key'] for item in items)
+                new_items.extend(fresh)
+                last_page, page_keys = page, [item['key'] for item in items]
+                if cursor['items'] + len(new_items) >= count:
+                    break
+                page += 1
+
+        items = cursor['items'] + len(new_items)
+        # A counter that was not reached is kept as it was, so the next run tries again
+        count = count if items >= count else cursor['count']
+        with self.lock:
+            if new_items:
+                with open(os.path.join(self.directory, f"{kind}.jsonl"), 'a', encoding='utf-8') as f:
+                    for item in new_items:
+                        f.write(json.dumps({'id': vocab_id, **item}, ensure_ascii=False) + "\n")
+            cursor = {
+                'id': vocab_id, 'kind': kind, 'count': count, 'items': items,
+                'page': last_page, 'seen': page_keys, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }
+            self.cursors[f"{kind}:{vocab_id}"] = cursor
+            with open(self.cursors_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(cursor, ensure_ascii=False) + "\n")
+        return len(new_items)
+
+    def run(self, vocabularies: List[Dict], kinds=tuple(TARGETS), workers: int = 4) -> Dict[str, int]:
+        """Crawl every vocabulary whose counters changed since its cursor."""
+        tasks = [
+            (vocab['id'], kind, vocab.get(TARGETS[kind]['counter']) or 0)
+            for vocab in vocabularies for kind in kinds if self.needs_crawl(vocab, kind)
+        ]
+        stats = {'checked': len(vocabularies) * len(kinds), 'changed': len(tasks), 'items': 0, 'failed': 0}
+        print(f"{stats['changed']} of {stats['checked']} counters changed since the last crawl")
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(self.crawl, *task): task for task in tasks}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                vocab_id, kind, count = futures[future]
+                try:
+                    added = future.result()
+                    stats['items'] += added
+                    if added:
+                        print(f"  ✓ [{done}/{len(tasks)}] {vocab_id} {kind}: +{added}")
+                except Exception as e:
+                    stats['failed'] += 1
+                    print(f"  ✗ [{done}/{len(tasks)}] {vocab_id} {kind}: {e}")
+        except KeyboardInterrupt:
+            print("\n⚠ Stopping after the vocabularies in progress...")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        stats['requests'] = self.requests
+        self.compact_cursors()
+        return stats
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Archive vocabulary comments and edit history incrementally")
+    arg_parser.add_argument('archive', help="Archive directory (cursors.jsonl, comments.jsonl, history.jsonl)")
+    arg_parser.add_argument('dataset', help="Dataset with current counters (e.g. after an extractor --mode counters run)")
+    arg_parser.add_argument('--kind', choices=list(TARGETS), action='append', help="Only crawl this kind (repeatable)")
+    arg_parser.add_argument('--workers', type=int, default=4, help="Number of crawling threads")
+    arg_parser.add_argument('--delay', type=float, default=0.2, help="Pause after each request, per thread")
+    arg_parser.add_argument('--ids', help="Comma-separated vocabulary IDs to limit the crawl to")
+    args = arg_parser.parse_args()
+
+    from KG_ValidVocabulariesExtractor import load_dataset
+
+    vocabularies = load_dataset(args.dataset)
+    if args.ids:
+        wanted = {int(vocab_id) for vocab_id in args.ids.split(',') if vocab_id.strip()}
+        vocabularies = [vocab for vocab in vocabularies if vocab['id'] in wanted]
+
+    crawler = ActivityCrawler(args.archive, delay=args.delay)
+    start = time.perf_counter()
+    stats = crawler.run(vocabularies, tuple(args.kind or TARGETS), args.workers)
+    print(f"✓ {stats['items']} new items from {stats['requests']} requests "
+          f"({stats['changed']} of {stats['checked']} counters changed, {stats['failed']} failed) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
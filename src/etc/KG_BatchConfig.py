@@ -0,0 +1,38 @@
+import argparse
+import json
+import signal
+from typing import Callable, List, Optional
+
+
+def parse_args_with_config(parser: argparse.ArgumentParser, argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse arguments, taking defaults from a --config JSON file.
+
+    Config keys are the long option names (with dashes or underscores);
+    flags given on the command line still win.
+    """
+    parser.add_argument('--config', metavar='PATH',
+                        help="JSON file with option values, e.g. {\"batch\": true, \"workers\": 20}")
+    known, _ = parser.parse_known_args(argv)
+    if known.config:
+        with open(known.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        destinations = {action.dest for action in parser._actions} - {'help', 'config'}
+        defaults = {}
+        for key, value in config.items():
+            dest = key.lstrip('-').replace('-', '_')
+            if dest not in destinations:
+                parser.error(f"Unknown option in {known.config}: {key}")
+            defaults[dest] = value
+        parser.set_defaults(**defaults)
+    return parser.parse_args(argv)
+
+
+def install_stop_handlers(stop: Callable[[], None]):
+    """Call stop() on SIGINT/SIGTERM (and SIGHUP where available) instead of raising."""
+    def handler(sig, frame):
+        print(f"\nReceived {signal.Signals(sig).name}, stopping after the current work...")
+        stop()
+
+    for name in ('SIGINT', 'SIGTERM', 'SIGHUP'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handler)
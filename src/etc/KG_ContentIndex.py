@@ -0,0 +1,260 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional
+
+# Cyrillic, Latin and digit runs; ё is folded into е so both spellings match
+TOKEN_RE = re.compile(r'[0-9a-zа-яё]+')
+# The delta log is merged into the index once it outgrows the index, or this size
+MERGE_MIN_BYTES = 4 << 20
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+
+
+def delta_path(path) -> str:
+    """Log of re-indexed vocabularies appended next to an index between full rewrites."""
+    return f"{path}.delta.jsonl"
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """Split a query into clauses: "quoted phrases" or single words; a trailing * marks a prefix."""
+    clauses = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        text = phrase or word
+        tokens = tokenize(text)
+        if tokens and text.rstrip('"').endswith('*'):
+            tokens[-1] += '*'
+        if tokens:
+            clauses.append(tokens)
+    return clauses
+
+
+class ContentIndex:
+    """Positional inverted index over vocabulary content entries.
+
+    postings maps a term to {vocab_id: [positions]}. Positions run across
+    all entries of a vocabulary with a gap between entries, so phrases never
+    match across two entries; documents keep the entry start positions and
+    the terms of each vocabulary so it can be replaced incrementally.
+    """
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.documents: Dict[int, Dict] = {}
+        self.sorted_terms: Optional[List[str]] = None
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add_document(self, vocab_id: int, entries: Iterable[str]):
+        self.remove_document(vocab_id)
+        starts = []
+        positions = {}
+        position = 0
+        for entry in entries:
+            starts.append(position)
+            tokens = tokenize(entry)
+            for offset, token in enumerate(tokens):
+                positions.setdefault(token, []).append(position + offset)
+            position += len(tokens) + 1
+
+        for term, term_positions in positions.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self.sorted_terms = None
+            self.postings[term][vocab_id] = term_positions
+        self.documents[vocab_id] = {'starts': starts, 'terms': list(positions)}
+
+    def remove_document(self, vocab_id: int):
+        document = self.documents.pop(vocab_id, None)
+        if not document:
+            return
+        for term in document['terms']:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(vocab_id, None)
+                if not docs:
+                    del self.postings[term]
+                    self.sorted_terms = None
+
+    def update(self, records: Iterable, retain_only: bool = False, retain_ids: Optional[Iterable[int]] = None) -> int:
+        """Re-index records that carry content.
+
+        With retain_only, vocabularies not among the records are dropped; with
+        retain_ids, those not in that ID list (e.g. valid_vocabularies.txt).
+        Records without any content (a dataset read without its content store)
+        never prune the index.
+        """
+        seen = set()
+        for record in records:
+            content = record.get('content')
+            if content is None:
+                continue
+            seen.add(record['id'])
+            if content:
+                self.add_document(record['id'], content)
+            else:
+                self.remove_document(record['id'])
+        keep = (seen or None) if retain_only else set(retain_ids) if retain_ids is not None else None
+        if keep is not None:
+            for vocab_id in [vocab_id for vocab_id in self.documents if vocab_id not in keep]:
+                self.remove_document(vocab_id)
+        return len(seen)
+
+    def expand(self, token: str) -> List[str]:
+        """Terms matching a token; a trailing * matches every term with that prefix."""
+        if not token.endswith('*'):
+            return [token] if token in self.postings else []
+        prefix = token[:-1]
+        if self.sorted_terms is None:
+            self.sorted_terms = sorted(self.postings)
+        start = bisect_left(self.sorted_terms, prefix)
+        end = bisect_left(self.sorted_terms, prefix + '\uffff', start)
+        return self.sorted_terms[start:end]
+
+    def token_positions(self, token: str, candidates: Optional[set] = None) -> Dict[int, set]:
+        result = {}
+        for term in self.expand(token):
+            for vocab_id, positions in self.postings[term].items():
+                if candidates is None or vocab_id in candidates:
+                    result.setdefault(vocab_id, set()).update(positions)
+        return result
+
+    def phrase_positions(self, tokens: List[str]) -> Dict[int, List[int]]:
+        """Start positions of the phrase in every vocabulary that contains it."""
+        matches = self.token_positions(tokens[0])
+        for offset, token in enumerate(tokens[1:], 1):
+            if not matches:
+                break
+            following = self.token_positions(token, set(matches))
+            matches = {
+                vocab_id: {start for start in starts if start + offset in following[vocab_id]}
+                for vocab_id, starts in matches.items() if vocab_id in following
+            }
+            matches = {vocab_id: starts for vocab_id, starts in matches.items() if starts}
+        return {vocab_id: sorted(starts) for vocab_id, starts in matches.items()}
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Dict]:
+        """Vocabularies matching every clause, most hits first, with the matching entry indices."""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        # Rarest clause first keeps the intersections small
+        clause_matches = sorted((self.phrase_positions(tokens) for tokens in clauses), key=len)
+        vocab_ids = set(clause_matches[0])
+        for matches in clause_matches[1:]:
+            vocab_ids &= matches.keys()
+
+        results = []
+        for vocab_id in vocab_ids:
+            starts = self.documents[vocab_id]['starts']
+            entries = set()
+            hits = 0
+            for matches in clause_matches:
+                hits += len(matches[vocab_id])
+                entries.update(bisect_right(starts, position) - 1 for position in matches[vocab_id])
+            results.append({'id': vocab_id, 'hits': hits, 'entries': sorted(entries)})
+        results.sort(key=lambda result: (-result['hits'], result['id']))
+        return results[:limit] if limit else results
+
+    def to_dict(self) -> Dict:
+        return {'version': 1, 'documents': self.documents, 'postings': self.postings}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ContentIndex':
+        index = cls()
+        index.documents = {int(vocab_id): document for vocab_id, document in data.get('documents', {}).items()}
+        index.postings = {
+            term: {int(vocab_id): positions for vocab_id, positions in docs.items()}
+            for term, docs in data.get('postings', {}).items()
+        }
+        return index
+
+    @classmethod
+    def load(cls, path) -> 'ContentIndex':
+        """Load a saved index with its delta log applied, or start an empty one when there is none yet."""
+        index = cls()
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                index = cls.from_dict(json.load(f))
+        if os.path.exists(delta_path(path)):
+            with open(delta_path(path), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry['content']:
+                            index.add_document(entry['id'], entry['content'])
+                        else:
+                            index.remove_document(entry['id'])
+        return index
+
+    def save(self, path):
+        """Write the index as gzipped JSON, atomically; the delta log is merged into it."""
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        if os.path.exists(delta_path(path)):
+            os.remove(delta_path(path))
+
+    @staticmethod
+    def append(path, records: Iterable) -> int:
+        """Log records that carry content to the delta, without reading or rewriting the index."""
+        count = 0
+        with open(delta_path(path), 'a', encoding='utf-8') as f:
+            for record in records:
+                if record.get('content') is not None:
+                    f.write(json.dumps({'id': record['id'], 'content': record['content']}, ensure_ascii=False) + "\n")
+                    count += 1
+        return count
+
+    @staticmethod
+    def needs_merge(path) -> bool:
+        """True once the delta log is big enough to be worth a full rewrite."""
+        if not os.path.exists(delta_path(path)):
+            return False
+        index_size = os.path.getsize(path) if os.path.exists(path) else 0
+        return os.path.getsize(delta_path(path)) > max(index_size, MERGE_MIN_BYTES)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Build or query the full-text index over vocabulary content")
+    arg_parser.add_argument('index', help="Index file (e.g. klavogonki_content_index.json.gz)")
+    arg_parser.add_argument('query', nargs='*', help='Query: words, "quoted phrases", prefix*')
+    arg_parser.add_argument('--build', metavar='DATASET', help="(Re)index a dataset written by the extractor")
+    arg_parser.add_argument('--content-store', metavar='DIR', help="Content store used by the dataset")
+    arg_parser.add_argument('--limit', type=int, default=20, help="Maximum number of results")
+    args = arg_parser.parse_intermixed_args()
+
+    start = time.perf_counter()
+    index = ContentIndex.load(args.index)
+    print(f"Loaded {len(index)} vocabularies, {len(index.postings)} terms in {time.perf_counter() - start:.2f}s")
+
+    if args.build:
+        from KG_ValidVocabulariesExtractor import load_dataset
+
+        records = load_dataset(args.build, args.content_store)
+        if not any('content' in record for record in records):
+            arg_parser.error(f"No record in {args.build} has content; pass --content-store if it was saved with one")
+        count = index.update(records, retain_only=True)
+        index.save(args.index)
+        print(f"✓ Indexed {count} vocabularies ({len(index.postings)} terms) into {args.index}")
+
+    if args.query:
+        query = ' '.join(args.query)
+        start = time.perf_counter()
+        results = index.search(query, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{len(results)} results for {query} ({elapsed:.1f} ms)")
+        for result in results:
+            entries = ', '.join(str(entry) for entry in result['entries'][:10])
+            print(f"  {result['id']}: {result['hits']} hits, entries {entries}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Fixed-width tables, each an append-only little-endian file that is memory-mapped for reading
+BLOCK_DTYPE = np.dtype([('offset', '<u8'), ('length', '<u4')])
+ENTRY_DTYPE = np.dtype([('hash', '<u8'), ('block', '<u4'), ('index', '<u4')])
+REF_DTYPE = np.dtype('<u4')
+VOCAB_DTYPE = np.dtype([('id', '<u8'), ('start', '<u8'), ('count', '<u4')])
+
+BLOCK_SIZE = 1 << 16      # Uncompressed bytes of distinct entries per compressed block
+SEPARATOR = '\x00'        # Entries inside a block (content text never contains NUL)
+CACHED_BLOCKS = 64
+
+
+def entry_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class ContentStore:
+    """Content-addressed, deduplicated store for vocabulary content.
+
+    Every distinct entry string is stored once, packed with its neighbours
+    into zlib-compressed blocks. A vocabulary is a run of entry IDs in
+    refs.bin; vocabs.bin maps vocabulary IDs to their latest run, so
+    re-extracted vocabularies are simply appended. All tables are read
+    through memory maps and blocks are only decompressed on access.
+    """
+    files = {
+        'blocks': ('blocks.bin', np.dtype('u1')),
+        'block_index': ('block_index.bin', BLOCK_DTYPE),
+        'entries': ('entries.bin', ENTRY_DTYPE),
+        'refs': ('refs.bin', REF_DTYPE),
+        'vocabs': ('vocabs.bin', VOCAB_DTYPE),
+    }
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hash_to_entry = None
+        self.pending_entries: List[str] = []
+        self.pending_refs: List[int] = []
+        self.pending_vocabs: List[tuple] = []
+        self.block_cache = OrderedDict()
+        self.open()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, self.files[name][0])
+
+    def open(self):
+        """(Re)map every table; called again after each flush."""
+        for name, (filename, dtype) in self.files.items():
+            path = self.path(name)
+            if os.path.exists(path) and os.path.getsize(path) >= dtype.itemsize:
+                setattr(self, name, np.memmap(path, dtype=dtype, mode='r'))
+            else:
+                setattr(self, name, np.zeros(0, dtype=dtype))
+        # Latest run wins for vocabularies stored more than once
+        self.vocab_rows = {int(vocab_id): row for row, vocab_id in enumerate(self.vocabs['id'])}
+
+    def __contains__(self, vocab_id: int) -> bool:
+        return vocab_id in self.vocab_rows
+
+    def __len__(self) -> int:
+        return len(self.vocab_rows)
+
+    def entry_ids(self, vocab_id: int) -> np.ndarray:
+        row = self.vocabs[self.vocab_rows[vocab_id]]
+        return self.refs[row['start']:row['start'] + row['count']]
+
+    def entry_count(self, vocab_id: int) -> int:
+        """Number of entries without touching content bytes."""
+        return int(self.vocabs[self.vocab_rows[vocab_id]]['count'])
+
+    def block(self, number: int) -> List[str]:
+        cached = self.block_cache.get(number)
+        if cached is None:
+            entry = self.block_index[number]
+            data = self.blocks[entry['offset']:entry['offset'] + entry['length']].tobytes()
+            cached = zlib.decompress(data).decode('utf-8').split(SEPARATOR)
+            self.block_cache[number] = cached
+            if len(self.block_cache) > CACHED_BLOCKS:
+                self.block_cache.popitem(last=False)
+        else:
+            self.block_cache.move_to_end(number)
+        return cached
+
+    def get(self, vocab_id: int, default=None) -> List[str]:
+        """Content entries of a vocabulary in their original order."""
+        if vocab_id not in self.vocab_rows:
+            return default
+        rows = self.entries[self.entry_ids(vocab_id)]
+        return [self.block(int(block))[int(index)] for block, index in zip(rows['block'], rows['index'])]
+
+    def put(self, vocab_id: int, entries: Iterable[str]):
+        """Queue a vocabulary's content; nothing is written until flush()."""
+        if self.hash_to_entry is None:
+            self.hash_to_entry = {int(value): entry_id for entry_id, value in enumerate(self.entries['hash'])}
+
+        refs = []
+        for text in entries:
+            key = entry_hash(text)
+            entry_id = self.hash_to_entry.get(key)
+            if entry_id is None:
+                entry_id = len(self.entries) + len(self.pending_entries)
+                self.hash_to_entry[key] = entry_id
+                self.pending_entries.append(text)
+            refs.append(entry_id)
+
+        # Unchanged content of an already stored vocabulary is not written again
+        if vocab_id in self.vocab_rows and np.array_equal(self.entry_ids(vocab_id), refs):
+            return
+        start = len(self.refs) + len(self.pending_refs)
+        self.pending_refs.extend(refs)
+        self.pending_vocabs.append((vocab_id, start, len(refs)))
+
+    def append_array(self, name: str, array: np.ndarray):
+        with open(self.path(name), 'ab') as f:
+            f.write(array.tobytes())
+
+    def flush(self):
+        """Compress queued entries into blocks and append every table."""
+        if not self.pending_vocabs and not self.pending_entries:
+            return
+
+        block_rows, entry_rows = [], []
+        offset = os.path.getsize(self.path('blocks')) if os.path.exists(self.path('blocks')) else 0
+        block_number = len(self.block_index)
+        with open(self.path('blocks'), 'ab') as f:
+            start = 0
+            while start < len(self.pending_entries):
+                size, end = 0, start
+                while end < len(self.pending_entries) and (end == start or size < BLOCK_SIZE):
+                    size += len(self.pending_entries[end].encode('utf-8')) + 1
+                    end += 1
+                chunk = self.pending_entries[start:end]
+                data = zlib.compress(SEPARATOR.join(chunk).encode('utf-8'), 9)
+                f.write(data)
+                block_rows.append((offset, len(data)))
+                entry_rows.extend((entry_hash(text), block_number, index) for index, text in enumerate(chunk))
+                offset += len(data)
+                block_number += 1
+                start = end
+
+        self.append_array('block_index', np.array(block_rows, dtype=BLOCK_DTYPE))
+        self.append_array('entries', np.array(entry_rows, dtype=ENTRY_DTYPE))
+        self.append_array('refs', np.array(self.pending_refs, dtype=REF_DTYPE))
+        self.append_array('vocabs', np.array(self.pending_vocabs, dtype=VOCAB_DTYPE))
+        self.pending_entries, self.pending_refs, self.pending_vocabs = [], [], []
+        self.open()
+
+    def update(self, records: Iterable) -> int:
+        """Store the content of every record that carries it and flush."""
+        count = 0
+        for record in records:
+            if record.get('content') is not None:
+                self.put(record['id'], record['content'])
+                count += 1
+        self.flush()
+        return count
+
+    def stats(self) -> Dict:
+        return {
+            'vocabularies': len(self),
+            'references': len(self.refs),
+            'distinct_entries': len(self.entries),
+            'blocks': len(self.block_index),
+            'bytes': sum(os.path.getsize(self.path(name)) for name in self.files if os.path.exists(self.path(name)))
+        }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Deduplicated, compressed store for vocabulary content")
+    arg_parser.add_argument('directory', help="Store directory")
+    arg_parser.add_argument('--import', dest='dataset', metavar='DATASET', help="Store the content of a JSON dataset")
+    arg_parser.add_argument('--get', type=int, metavar='ID', help="Print the content of one vocabulary")
+    args = arg_parser.parse_args()
+
+    store = ContentStore(args.directory)
+    if args.dataset:
+        from KG_ValidVocabulariesExtractor import load_dataset
+
+        vocabularies = load_dataset(args.dataset)
+        count = store.update(vocabularies)
+        raw = sum(len(text.encode('utf-8')) for vocab in vocabularies for text in vocab.get('content') or [])
+        stats = store.stats()
+        print(f"✓ Stored content of {count} vocabularies: {stats['distinct_entries']} distinct of "
+              f"{stats['references']} entries, {raw} B of text → {stats['bytes']} B")
+
+    if args.get is not None:
+        entries = store.get(args.get)
+        if entries is None:
+            print(f"{args.get}: not in store")
+        else:
+            for text in entries:
+                print(text)
+
+    if not args.dataset and args.get is None:
+        for key, value in store.stats().items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
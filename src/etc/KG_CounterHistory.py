@@ -0,0 +1,164 @@
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+COUNTERS = ('rating', 'users_count', 'history_count', 'comments_count')
+
+RUN_DTYPE = np.dtype([('ts', '<i8'), ('start', '<u8'), ('count', '<u4')])
+ROW_DTYPE = np.dtype([
+    ('run', '<u4'), ('id', '<u4'),
+    ('rating', '<i2'), ('users_count', '<i4'), ('history_count', '<i4'), ('comments_count', '<i4')
+])
+
+
+def parse_time(value: Optional[str]) -> Optional[int]:
+    """ISO date/time (e.g. 2026-10-01 or 2026-10-01T12:00) to a Unix timestamp."""
+    if not value:
+        return None
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def format_time(ts: int) -> str:
+    return datetime.fromtimestamp(int(ts)).isoformat(sep=' ', timespec='minutes')
+
+
+class CounterHistory:
+    """Append-only columnar time series of vocabulary counters.
+
+    Every extractor run appends one block of fixed-width rows (run, id and
+    the counters) sorted by ID, and one entry in runs.bin with its timestamp
+    and row range. Runs are appended in time order, so a time range maps to
+    one contiguous slice of the memory-mapped rows file.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.runs_path = os.path.join(directory, 'runs.bin')
+        self.rows_path = os.path.join(directory, 'rows.bin')
+        os.makedirs(directory, exist_ok=True)
+        self.open()
+
+    def open(self):
+        self.runs = self.map(self.runs_path, RUN_DTYPE)
+        self.rows = self.map(self.rows_path, ROW_DTYPE)
+
+    @staticmethod
+    def map(path: str, dtype: np.dtype) -> np.ndarray:
+        if os.path.exists(path) and os.path.getsize(path) >= dtype.itemsize:
+            return np.memmap(path, dtype=dtype, mode='r')
+        return np.zeros(0, dtype=dtype)
+
+    def append(self, records: Iterable, ts: Optional[int] = None) -> int:
+        """Append the counters of one run; returns the number of rows written."""
+        ts = int(ts if ts is not None else time.time())
+        if len(self.runs) and ts < self.runs['ts'][-1]:
+            raise ValueError("Runs must be appended in time order")
+
+        run = len(self.runs)
+        rows = np.array(
+            [(run, record['id']) + tuple(record.get(name) or 0 for name in COUNTERS) for record in records],
+            dtype=ROW_DTYPE
+        )
+        if not len(rows):
+            return 0
+        rows = rows[np.argsort(rows['id'], kind='stable')]
+
+        with open(self.rows_path, 'ab') as f:
+            f.write(rows.tobytes())
+        with open(self.runs_path, 'ab') as f:
+            f.write(np.array([(ts, len(self.rows), len(rows))], dtype=RUN_DTYPE).tobytes())
+        self.open()
+        return len(rows)
+
+    def run_range(self, since: Optional[int] = None, until: Optional[int] = None) -> range:
+        """Indices of the runs with since <= ts <= until."""
+        first = int(np.searchsorted(self.runs['ts'], since, side='left')) if since is not None else 0
+        last = int(np.searchsorted(self.runs['ts'], until, side='right')) if until is not None else len(self.runs)
+        return range(first, max(first, last))
+
+    def range_rows(self, since: Optional[int] = None, until: Optional[int] = None) -> np.ndarray:
+        """Rows of every run in the time range, in run order."""
+        runs = self.run_range(since, until)
+        if not runs:
+            return self.rows[:0]
+        start = int(self.runs['start'][runs[0]])
+        end = int(self.runs['start'][runs[-1]] + self.runs['count'][runs[-1]])
+        return self.rows[start:end]
+
+    def series(self, vocab_id: int, since: Optional[int] = None, until: Optional[int] = None) -> List[Dict]:
+        """Counter values of one vocabulary over time."""
+        result = []
+        for run in self.run_range(since, until):
+            start, count = int(self.runs['start'][run]), int(self.runs['count'][run])
+            ids = self.rows['id'][start:start + count]
+            i = np.searchsorted(ids, vocab_id)
+            if i < count and ids[i] == vocab_id:
+                row = self.rows[start + i]
+                result.append({'ts': int(self.runs['ts'][run]), **{name: int(row[name]) for name in COUNTERS}})
+        return result
+
+    def growth(self, column: str, since: Optional[int] = None, until: Optional[int] = None,
+               top: int = 20) -> List[Dict]:
+        """Vocabularies whose counter grew most between their first and last observation in the range."""
+        if column not in COUNTERS:
+            raise ValueError(f"Unknown counter: {column}")
+        rows = self.range_rows(since, until)
+        if not len(rows):
+            return []
+        ids = np.asarray(rows['id'])
+        values = np.asarray(rows[column], dtype=np.int64)
+        runs = np.asarray(rows['run'])
+
+        # Stable sort keeps each vocabulary's rows in run order
+        order = np.argsort(ids, kind='stable')
+        ids, values, runs = ids[order], values[order], runs[order]
+        boundaries = np.flatnonzero(np.diff(ids)) + 1
+        first = np.concatenate(([0], boundaries))
+        last = np.concatenate((boundaries - 1, [len(ids) - 1]))
+
+        delta = values[last] - values[first]
+        days = (self.runs['ts'][runs[last]] - self.runs['ts'][runs[first]]) / 86400
+        best = np.argsort(-delta, kind='stable')[:top]
+        return [{
+            'id': int(ids[last[i]]),
+            'from': int(values[first[i]]),
+            'to': int(values[last[i]]),
+            'delta': int(delta[i]),
+            'per_day': round(float(delta[i] / days[i]), 2) if days[i] > 0 else None
+        } for i in best if delta[i] > 0]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Query the vocabulary counter history")
+    arg_parser.add_argument('directory', help="History directory written by the extractor")
+    arg_parser.add_argument('--growth', choices=COUNTERS, help="Fastest-growing vocabularies by this counter")
+    arg_parser.add_argument('--series', type=int, metavar='ID', help="Counter history of one vocabulary")
+    arg_parser.add_argument('--since', help="Start of the range (ISO date/time)")
+    arg_parser.add_argument('--until', help="End of the range (ISO date/time)")
+    arg_parser.add_argument('--top', type=int, default=20, help="Number of vocabularies for --growth")
+    args = arg_parser.parse_args()
+
+    history = CounterHistory(args.directory)
+    since, until = parse_time(args.since), parse_time(args.until)
+
+    if args.growth:
+        start = time.perf_counter()
+        results = history.growth(args.growth, since, until, args.top)
+        print(f"Top {len(results)} by {args.growth} growth ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        for result in results:
+            per_day = f", {result['per_day']}/day" if result['per_day'] is not None else ''
+            print(f"  {result['id']}: {result['from']} → {result['to']} (+{result['delta']}{per_day})")
+    elif args.series is not None:
+        for point in history.series(args.series, since, until):
+            print(f"  {format_time(point['ts'])} | " + ' | '.join(f"{name}: {point[name]}" for name in COUNTERS))
+    else:
+        print(f"{len(history.runs)} runs, {len(history.rows)} rows")
+        for run in history.runs[-10:]:
+            print(f"  {format_time(run['ts'])}: {run['count']} vocabularies")
+
+
+if __name__ == "__main__":
+    main()
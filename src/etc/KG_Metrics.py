@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: Tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in labels) + '}'
+
+
+class Metrics:
+    """Thread-safe live counters, gauges and latency histograms.
+
+    Exposed in Prometheus text format on a local HTTP endpoint (/metrics,
+    plus /metrics.json) and written as periodic JSON snapshots.
+    """
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.types = {}
+        self.help = {}
+        self.values = {}
+        self.histograms = {}
+        self.callbacks = {}
+        self.server = None
+
+    def register(self, name: str, metric_type: str, help_text: str):
+        self.types[name] = metric_type
+        self.help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def gauge_callback(self, name: str, callback: Callable[[], float]):
+        """Gauge evaluated at export time (e.g. queue depths)."""
+        self.callbacks[name] = callback
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * len(DEFAULT_BUCKETS), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(DEFAULT_BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    @contextmanager
+    def timed(self, name: str, in_flight: Optional[str] = None, **labels):
+        """Observe the duration of a block, optionally tracking an in-flight gauge."""
+        if in_flight:
+            self.inc(in_flight, 1)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+            if in_flight:
+                self.inc(in_flight, -1)
+
+    def collect(self):
+        """Consistent copy of all values, histograms and callback gauges."""
+        with self.lock:
+            values = dict(self.values)
+            histograms = {key: {'buckets': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                          for key, h in self.histograms.items()}
+        for name, callback in self.callbacks.items():
+            try:
+                values[(name, ())] = callback()
+            except Exception:
+                pass
+        return values, histograms
+
+    def prometheus_text(self) -> str:
+        values, histograms = self.collect()
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {self.namespace}_{name} {self.help[name]}")
+                lines.append(f"# TYPE {self.namespace}_{name} {self.types.get(name, 'gauge')}")
+
+        for (name, labels), value in sorted(values.items()):
+            describe(name)
+            lines.append(f"{self.namespace}_{name}{format_labels(labels)} {value}")
+
+        for (name, labels), histogram in sorted(histograms.items()):
+            describe(name)
+            cumulative = 0
+            for bound, count in zip(DEFAULT_BUCKETS, histogram['buckets']):
+                cumulative += count
+                lines.append(f"{self.namespace}_{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.namespace}_{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{self.namespace}_{name}_sum{format_labels(labels)} {round(histogram['sum'], 6)}")
+            lines.append(f"{self.namespace}_{name}_count{format_labels(labels)} {histogram['count']}")
+
+        lines.append(f"{self.namespace}_uptime_seconds {round(time.time() - self.started, 3)}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict:
+        values, histograms = self.collect()
+        snapshot = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'uptime_seconds': round(time.time() - self.started, 3),
+            'metrics': {},
+            'histograms': {}
+        }
+        for (name, labels), value in sorted(values.items()):
+            snapshot['metrics'].setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        for (name, labels), histogram in sorted(histograms.items()):
+            snapshot['histograms'].setdefault(name, []).append({
+                'labels': dict(labels),
+                'buckets': dict(zip([str(b) for b in DEFAULT_BUCKETS], histogram['buckets'])),
+                'sum': round(histogram['sum'], 6),
+                'count': histogram['count'],
+                'mean': round(histogram['sum'] / histogram['count'], 6) if histogram['count'] else 0
+            })
+        return snapshot
+
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        """Serve /metrics (Prometheus) and /metrics.json on a background thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                elif self.path.startswith('/metrics'):
+                    body = metrics.prometheus_text().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Metrics available at http://{host}:{port}/metrics")
+
+    def write_snapshot(self, path: str):
+        """Write a JSON snapshot atomically (readers never see a partial file)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def start_snapshots(self, path: str, interval: float = 10):
+        """Write JSON snapshots every interval seconds on a background thread."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_snapshot(path)
+                except Exception as e:
+                    print(f"Could not write metrics snapshot: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def start(self, port: Optional[int] = None, snapshot_path: Optional[str] = None, interval: float = 10):
+        """Start whichever exporters were requested."""
+        if port:
+            self.serve(port)
+        if snapshot_path:
+            self.start_snapshots(snapshot_path, interval)
@@ -0,0 +1,102 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Rule actions and the ledger outcome each one records
+ACTIONS = {
+    'approve': 'approved',
+    'reject': 'rejected',
+    'skip': 'skipped',
+    'human': None,
+}
+
+# Reproduces the behaviour that used to be hard-coded in moderate_results
+DEFAULT_RULES = {
+    'rules': [
+        {'name': 'private', 'when': {'is_public': False}, 'action': 'skip'},
+        {'name': 'url', 'when': {'type': 'url'}, 'action': 'reject'},
+        {'name': 'books_auto', 'when': {'type': 'books', 'entries': {'min': 10}}, 'action': 'approve'},
+        # No entries usually means the words block was not parsed, so a human looks at it
+        {'name': 'books_unparsed', 'when': {'type': 'books', 'entries': 0}, 'action': 'human'},
+        {'name': 'books_too_small', 'when': {'type': 'books'}, 'action': 'reject'},
+    ],
+    'default': 'human'
+}
+
+
+class ModerationRules:
+    """Ordered auto-moderation rules evaluated against parsed page fields.
+
+    Each rule has a name, a "when" mapping of field conditions and an action
+    (approve, reject, skip or human). The first rule whose conditions all
+    hold decides; otherwise the default action applies. A condition is
+    either a plain value (equality, or membership when it is a list) or a
+    mapping of operators: min, max, in, not_in, match (regex), not_match.
+    """
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or DEFAULT_RULES
+        self.rules = config.get('rules', [])
+        self.default = config.get('default', 'human')
+        self.compiled = {}
+        for rule in self.rules + [{'action': self.default}]:
+            if rule.get('action') not in ACTIONS:
+                raise ValueError(f"Unknown rule action: {rule.get('action')}")
+            for condition in rule.get('when', {}).values():
+                if isinstance(condition, dict):
+                    for op in ('match', 'not_match'):
+                        if op in condition:
+                            self.compiled[condition[op]] = re.compile(condition[op])
+
+    @classmethod
+    def load(cls, working_directory: str) -> 'ModerationRules':
+        """Load moderation_rules.json from the working directory, or the default rules."""
+        rules_file = os.path.join(working_directory, "moderation_rules.json")
+        if os.path.exists(rules_file):
+            try:
+                with open(rules_file, 'r', encoding='utf-8') as f:
+                    rules = cls(json.load(f))
+                print(f"Loaded {len(rules.rules)} moderation rules from {rules_file}")
+                return rules
+            except Exception as e:
+                print(f"Could not load moderation rules, using defaults: {e}")
+        return cls()
+
+    @staticmethod
+    def fields(record) -> Dict:
+        """Flatten a parsed vocabulary record into rule fields."""
+        fields = {key: record.get(key) for key in record.keys() if key != 'content'}
+        fields['entries'] = len(record.get('content') or [])
+        return fields
+
+    def matches(self, value, condition) -> bool:
+        if not isinstance(condition, dict):
+            if isinstance(condition, list):
+                return value in condition
+            return value == condition
+
+        for op, expected in condition.items():
+            if op == 'min' and not (value is not None and value >= expected):
+                return False
+            if op == 'max' and not (value is not None and value <= expected):
+                return False
+            if op == 'in' and value not in expected:
+                return False
+            if op == 'not_in' and value in expected:
+                return False
+            if op == 'match' and not self.compiled[expected].search(str(value or '')):
+                return False
+            if op == 'not_match' and self.compiled[expected].search(str(value or '')):
+                return False
+        return True
+
+    def evaluate(self, fields: Dict) -> Tuple[str, str]:
+        """Return (action, rule name) for the first matching rule."""
+        for rule in self.rules:
+            conditions = rule.get('when', {})
+            if all(self.matches(fields.get(name), condition) for name, condition in conditions.items()):
+                return rule['action'], rule.get('name', rule['action'])
+        return self.default, 'default'
+
+    def describe(self) -> List[str]:
+        return [f"{rule.get('name', rule['action'])}: {rule['action']}" for rule in self.rules]
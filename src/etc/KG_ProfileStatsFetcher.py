@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+API_URL = "https://klavogonki.ru/api/profile/get-stats-details"
+# Game types the API accepts besides voc-<id> (gameTypes in definitions.js)
+GAME_TYPES = ('normal', 'abra', 'noerror', 'marathon', 'chars', 'digits', 'sprint')
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Upper bound for a server-requested Retry-After wait
+MAX_RETRY_AFTER = 60
+
+
+def game_type(value) -> str:
+    """API gametype for a vocabulary ID or a standard game type name."""
+    value = str(value).strip()
+    if value.isdigit():
+        return f"voc-{value}"
+    if value in GAME_TYPES or value.startswith('voc-'):
+        return value
+    raise ValueError(f"Unsupported game type: {value}")
+
+
+def retry_delay(response: Optional[requests.Response], attempt: int) -> float:
+    """Seconds to wait before the next attempt: Retry-After when the server sent one, else exponential."""
+    retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+    if retry_after.strip().isdigit():
+        return min(int(retry_after), MAX_RETRY_AFTER)
+    return 2 ** attempt
+
+
+class StatsCache:
+    """On-disk cache of API responses, one JSON file per user and game type.
+
+    Successful responses live for ttl seconds, responses without stats
+    (ok: false) for error_ttl. A refreshed entry keeps the last response
+    that had races, so a vocabulary that disappears is still known as played.
+    """
+    def __init__(self, directory: str, ttl: float = 86400, error_ttl: float = 7 * 86400):
+        self.directory = directory
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+
+    def path(self, user_id: int, gametype: str) -> str:
+        return os.path.join(self.directory, str(user_id), f"{gametype}.json")
+
+    def read(self, user_id: int, gametype: str) -> Optional[Dict]:
+        try:
+            with open(self.path(user_id, gametype), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def fresh(self, entry: Optional[Dict]) -> bool:
+        if not entry:
+            return False
+        ttl = self.ttl if entry['data'].get('ok') else self.error_ttl
+        return time.time() - entry['fetched'] < ttl
+
+    def write(self, user_id: int, gametype: str, data: Dict, previous: Optional[Dict] = None) -> Dict:
+        entry = {'fetched': time.time(), 'data': data}
+        if races(data):
+            entry['last_played'] = data
+        elif previous and previous.get('last_played'):
+            entry['last_played'] = previous['last_played']
+
+        path = self.path(user_id, gametype)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        return entry
+
+
+def races(data: Optional[Dict]) -> int:
+    info = (data or {}).get('info') or {}
+    return int(info.get('num_races') or 0) if (data or {}).get('ok') else 0
+
+
+class ProfileStatsFetcher:
+    """Bulk get-stats-details for (user, game type) pairs with bounded concurrency."""
+    def __init__(self, cache: StatsCache, workers: int = 8, delay: float = 0.1, max_retries: int = 3):
+        self.cache = cache
+        self.workers = workers
+        self.delay = delay
+        self.max_retries = max_retries
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.counts = {'cached': 0, 'fetched': 0, 'failed': 0}
+
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+            self.local.session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+        return self.local.session
+
+    def count(self, key: str):
+        with self.lock:
+            self.counts[key] += 1
+
+    def fetch(self, user_id: int, gametype: str) -> Dict:
+        """Cache entry for one pair, requesting the API only when the entry is stale."""
+        previous = self.cache.read(user_id, gametype)
+        if self.cache.fresh(previous):
+            self.count('cached')
+            return previous
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session().get(API_URL, params={'userId': user_id, 'gametype': gametype}, timeout=15)
+            except requests.exceptions.RequestException:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(retry_delay(None, attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(retry_delay(response, attempt))
+                continue
+            response.raise_for_status()
+            break
+        time.sleep(self.delay)
+        self.count('fetched')
+        return self.cache.write(user_id, gametype, response.json(), previous)
+
+    def fetch_all(self, pairs: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], Dict]:
+        """Cache entries for every pair; pairs that fail are left out."""
+        pairs = list(dict.fromkeys(pairs))
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        futures = {executor.submit(self.fetch, *pair): pair for pair in pairs}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                pair = futures[future]
+                try:
+                    results[pair] = future.result()
+                except Exception as e:
+                    self.count('failed')
+                    print(f"  ✗ user {pair[0]}, {pair[1]}: {e}")
+                if done % 500 == 0 or done == len(pairs):
+                    print(f"  [{done}/{len(pairs)}] cached {self.counts['cached']}, "
+                          f"fetched {self.counts['fetched']}, failed {self.counts['failed']}")
+        except KeyboardInterrupt:
+            print("\n⚠ Stopping, responses fetched so far stay cached")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return results
+
+
+def aggregate(results: Dict[Tuple[int, str], Dict]) -> Dict[int, Dict]:
+    """Per-user table: played vocabularies (races > 0) and lost ones (played before, no longer available)."""
+    users = {}
+    for (user_id, gametype), entry in results.items():
+        row = users.setdefault(user_id, {
+            'played': [], 'lost': [], 'unplayed': 0, 'races': 0,
+            'seconds': 0, 'speed_sum': 0.0, 'best_speed': 0
+        })
+        data = entry['data']
+        game = int(gametype[4:]) if gametype.startswith('voc-') else gametype
+        if races(data):
+            row['played'].append(game)
+        elif entry.get('last_played') and not data.get('ok'):
+            row['lost'].append(game)
+            data = entry['last_played']
+        else:
+            row['unplayed'] += 1
+            continue
+
+        info = data.get('info') or {}
+        count = races(data)
+        row['races'] += count
+        row['seconds'] += int((info.get('haul') or {}).get('total') or 0)
+        row['speed_sum'] += float(info.get('avg_speed') or 0) * count
+        row['best_speed'] = max(row['best_speed'], int(info.get('best_speed') or 0))
+
+    for row in users.values():
+        for name in ('played', 'lost'):
+            row[name].sort(key=lambda game: (isinstance(game, str), game))
+        row['avg_speed'] = round(row.pop('speed_sum') / row['races'], 1) if row['races'] else None
+    return users
+
+
+def load_game_types(spec: str) -> List[str]:
+    """Game types from a comma-separated list, valid_vocabularies.txt or an extractor dataset."""
+    if os.path.exists(spec):
+        with open(spec, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if 'validVocabularies' in data:
+            ids = sorted({vocab_id for ids in data['validVocabularies'].values() for vocab_id in ids})
+        else:
+            ids = [vocab['id'] for vocab in data.get('vocabularies', [])]
+        return [game_type(vocab_id) for vocab_id in ids]
+    return [game_type(value) for value in spec.split(',') if value.strip()]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Bulk, cached get-stats-details per user and vocabulary")
+    arg_parser.add_argument('cache', help="Response cache directory")
+    arg_parser.add_argument('--users', required=True, help="Comma-separated user IDs")
+    arg_parser.add_argument('--games', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            'valid_vocabularies.txt'),
+                            help="Vocabulary IDs / game types (comma-separated), valid_vocabularies.txt or a dataset")
+    arg_parser.add_argument('--workers', type=int, default=8, help="Concurrent requests")
+    arg_parser.add_argument('--delay', type=float, default=0.1, help="Pause after each request, per thread")
+    arg_parser.add_argument('--ttl', type=float, default=24, help="Hours a response with stats stays cached")
+    arg_parser.add_argument('--error-ttl', type=float, default=168, help="Hours a response without stats stays cached")
+    arg_parser.add_argument('--output', metavar='PATH', help="Write the per-user table as JSON")
+    args = arg_parser.parse_args()
+
+    try:
+        users = [int(user_id) for user_id in args.users.split(',') if user_id.strip()]
+        games = load_game_types(args.games)
+    except ValueError as e:
+        arg_parser.error(str(e))
+
+    cache = StatsCache(args.cache, ttl=args.ttl * 3600, error_ttl=args.error_ttl * 3600)
+    fetcher = ProfileStatsFetcher(cache, workers=args.workers, delay=args.delay)
+    print(f"{len(users)} users × {len(games)} game types = {len(users) * len(games)} pairs")
+
+    start = time.perf_counter()
+    results = fetcher.fetch_all((user_id, gametype) for user_id in users for gametype in games)
+    table = aggregate(results)
+    print(f"✓ {len(results)} pairs in {time.perf_counter() - start:.1f}s "
+          f"({fetcher.counts['fetched']} requests, {fetcher.counts['cached']} from cache)")
+
+    print(f"\n{'User':>10} | {'Played':>6} | {'Lost':>5} | {'Races':>7} | {'Avg speed':>9} | Best")
+    for user_id, row in table.items():
+        print(f"{user_id:>10} | {len(row['played']):>6} | {len(row['lost']):>5} | {row['races']:>7} | "
+              f"{row['avg_speed'] if row['avg_speed'] is not None else '-':>9} | {row['best_speed']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'generated': time.strftime('%Y-%m-%dT%H:%M:%S'), 'users': table}, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ Table saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
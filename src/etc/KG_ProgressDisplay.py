@@ -0,0 +1,142 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Optional
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressDisplay:
+    """Rate-limited progress region with per-item detail in a buffered log file.
+
+    Counters are cheap to bump from any thread; the region (rate, ETA,
+    status breakdown, recent approvals) is redrawn in place at most every
+    `refresh` seconds. When stdout is not a terminal a single summary line
+    is printed every `plain_interval` seconds instead.
+    """
+    def __init__(self, title: str, total: Optional[int] = None, log_path: Optional[str] = None,
+                 refresh: float = 0.5, recent: int = 5, plain_interval: float = 10,
+                 extra: Optional[Callable[[], str]] = None):
+        self.title = title
+        self.total = total
+        self.refresh = refresh
+        self.plain_interval = plain_interval
+        self.extra = extra
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.recent = deque(maxlen=recent)
+        self.samples = deque(maxlen=40)
+        self.started = time.time()
+        self.last_plain = 0.0
+        self.lines_drawn = 0
+        self.paused = False
+        self.running = False
+        self.thread = None
+        self.tty = sys.stdout.isatty()
+        self.log_file = open(log_path, 'a', encoding='utf-8', buffering=1 << 16) if log_path else None
+        if self.tty and os.name == 'nt':
+            os.system('')  # Enables ANSI escape handling in Windows consoles
+
+    def start(self):
+        self.running = True
+        self.started = time.time()
+        self.thread = threading.Thread(target=self.render_loop, daemon=True)
+        self.thread.start()
+
+    def inc(self, key: str, n: int = 1):
+        with self.lock:
+            self.counts[key] += n
+
+    def log(self, line: str):
+        """Per-item detail goes to the log file only."""
+        if self.log_file:
+            with self.lock:
+                self.log_file.write(f"{time.strftime('%H:%M:%S')} {line}\n")
+
+    def approval(self, text: str):
+        with self.lock:
+            self.recent.append(text)
+        self.log(text)
+
+    def message(self, text: str):
+        """Print a line above the progress region."""
+        with self.lock:
+            self.clear()
+            print(text, flush=True)
+
+    def pause(self):
+        """Stop redrawing (e.g. while an interactive prompt is shown)."""
+        with self.lock:
+            self.clear()
+            self.paused = True
+
+    def resume(self):
+        with self.lock:
+            self.paused = False
+
+    def clear(self):
+        if self.tty and self.lines_drawn:
+            sys.stdout.write(f"\x1b[{self.lines_drawn}F\x1b[J")
+            sys.stdout.flush()
+        self.lines_drawn = 0
+
+    def build_lines(self):
+        now = time.time()
+        done = sum(self.counts.values())
+        self.samples.append((now, done))
+        first_time, first_done = self.samples[0]
+        rate = (done - first_done) / (now - first_time) if now > first_time else 0.0
+
+        header = f"[{self.title}] {done}"
+        if self.total:
+            header += f"/{self.total} ({done / self.total:.1%})"
+        header += f" | {rate:.1f}/s | elapsed {format_duration(now - self.started)}"
+        if self.total and rate > 0:
+            header += f" | ETA {format_duration((self.total - done) / rate)}"
+        if self.extra:
+            header += f" | {self.extra()}"
+
+        lines = [header]
+        if self.counts:
+            lines.append("  " + " · ".join(f"{key} {count}" for key, count in self.counts.most_common()))
+        if self.recent:
+            lines.append("  Recent: " + " · ".join(self.recent))
+        return lines
+
+    def render(self):
+        with self.lock:
+            if self.paused:
+                return
+            lines = self.build_lines()
+            if self.tty:
+                self.clear()
+                sys.stdout.write('\n'.join(lines) + '\n')
+                sys.stdout.flush()
+                self.lines_drawn = len(lines)
+            elif time.time() - self.last_plain >= self.plain_interval:
+                self.last_plain = time.time()
+                print(' | '.join(line.strip() for line in lines), flush=True)
+
+    def render_loop(self):
+        while self.running:
+            self.render()
+            time.sleep(self.refresh)
+
+    def close(self):
+        """Stop the render thread, leave the final state on screen and flush the log."""
+        self.running = False
+        self.paused = False
+        if self.thread:
+            self.thread.join()
+        self.last_plain = 0.0
+        self.render()
+        with self.lock:
+            self.lines_drawn = 0
+            if self.log_file:
+                self.log_file.close()
+                self.log_file = None
@@ -0,0 +1,267 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from KG_ValidVocabulariesExtractor import dataset_updates_path, load_dataset
+from KG_VocabularyTable import VocabularyTable
+
+MAX_LIMIT = 1000
+DEFAULT_FIELDS = (
+    'id', 'name', 'author', 'type', 'language', 'category', 'rating', 'users_count',
+    'history_count', 'comments_count', 'created', 'is_public', 'entries'
+)
+# Query parameter → numeric column for min/max range filters
+RANGE_FILTERS = {
+    'rating': 'rating',
+    'users': 'users_count',
+    'history': 'history_count',
+    'comments': 'comments_count',
+    'entries': 'entries',
+}
+
+
+class IndexSnapshot:
+    """Immutable indexes over one version of the dataset.
+
+    Categorical columns (type, language, author, category) keep row lists per
+    value, numeric columns keep a sorted order for range filters and sorting.
+    """
+    def __init__(self, records: List[Dict], signature: Tuple):
+        self.records = records
+        self.table = table = VocabularyTable.from_records(records)
+        self.rows_by_value = {name: table.group_indices(name) for name in VocabularyTable.categorical_columns}
+        self.rows_by_id = {int(vocab_id): row for row, vocab_id in enumerate(table.columns['id'])}
+        self.sorted_rows = {
+            column: np.argsort(table.columns[column], kind='stable')
+            for column in ('id',) + tuple(RANGE_FILTERS.values())
+        }
+        self.version = hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:16]
+        self.signature = signature
+
+    def range_rows(self, column: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        order = self.sorted_rows[column]
+        values = self.table.columns[column][order]
+        start = np.searchsorted(values, low, side='left') if low is not None else 0
+        end = np.searchsorted(values, high, side='right') if high is not None else len(order)
+        return order[start:end]
+
+
+class VocabularyIndex:
+    """Current IndexSnapshot of an extracted dataset, rebuilt when the dataset changes.
+
+    A reload builds a complete new snapshot and swaps one reference, so a
+    request that captured the previous snapshot keeps a consistent view.
+    """
+    def __init__(self, dataset_path: str):
+        self.dataset_path = dataset_path
+        self.lock = threading.Lock()
+        self.snapshot: Optional[IndexSnapshot] = None
+        self.load()
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    def dataset_signature(self) -> Tuple:
+        signature = []
+        for path in (self.dataset_path, dataset_updates_path(self.dataset_path)):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            else:
+                signature.append(None)
+        return tuple(signature)
+
+    def load(self):
+        signature = self.dataset_signature()
+        records = load_dataset(self.dataset_path)
+        for record in records:
+            record['entries'] = record.get('entries', len(record.pop('content', None) or []))
+        self.snapshot = IndexSnapshot(records, signature)
+        print(f"Loaded {len(records)} vocabularies from {self.dataset_path}")
+
+    def refresh(self) -> IndexSnapshot:
+        """Reload if the dataset or its update log changed; returns the snapshot to serve from."""
+        if self.dataset_signature() != self.snapshot.signature:
+            with self.lock:
+                if self.dataset_signature() != self.snapshot.signature:
+                    try:
+                        self.load()
+                    except Exception as e:
+                        # Caught mid-write (e.g. a partial update line); retried on the next request
+                        print(f"⚠ Reload failed, serving version {self.snapshot.version}: {e}")
+        return self.snapshot
+
+    def query(self, params: Dict[str, List[str]], snapshot: Optional[IndexSnapshot] = None) -> Dict:
+        """Filter, sort, paginate and project; raises ValueError on bad parameters."""
+        snapshot = snapshot or self.snapshot
+        table = snapshot.table
+
+        def single(name, default=None):
+            return params[name][-1] if name in params else default
+
+        def number(name):
+            value = single(name)
+            return float(value) if value not in (None, '') else None
+
+        mask = np.ones(len(table), dtype=bool)
+        for name in VocabularyTable.categorical_columns:
+            if name in params:
+                selected = np.zeros(len(table), dtype=bool)
+                for value in ','.join(params[name]).split(','):
+                    rows = snapshot.rows_by_value[name].get(value)
+                    if rows is not None:
+                        selected[rows] = True
+                mask &= selected
+
+        for param, column in RANGE_FILTERS.items():
+            low, high = number(f'{param}_min'), number(f'{param}_max')
+            if low is not None or high is not None:
+                selected = np.zeros(len(table), dtype=bool)
+                selected[snapshot.range_rows(column, low, high)] = True
+                mask &= selected
+
+        if 'public' in params:
+            mask &= table.columns['is_public'] == (single('public') in ('1', 'true', 'yes'))
+
+        if 'ids' in params:
+            selected = np.zeros(len(table), dtype=bool)
+            for vocab_id in ','.join(params['ids']).split(','):
+                row = snapshot.rows_by_id.get(int(vocab_id)) if vocab_id.strip() else None
+                if row is not None:
+                    selected[row] = True
+            mask &= selected
+
+        sort = single('sort', 'id')
+        column = sort.lstrip('-')
+        if column not in snapshot.sorted_rows:
+            raise ValueError(f"Cannot sort by {column}")
+        order = snapshot.sorted_rows[column]
+        if sort.startswith('-'):
+            order = order[::-1]
+        rows = order[mask[order]]
+
+        offset = max(0, int(single('offset', 0)))
+        limit = min(MAX_LIMIT, max(0, int(single('limit', 100))))
+        fields = single('fields')
+        fields = [field for field in fields.split(',') if field] if fields else DEFAULT_FIELDS
+
+        return {
+            'version': snapshot.version,
+            'total': int(len(rows)),
+            'offset': offset,
+            'limit': limit,
+            'items': [self.project(snapshot.records[row], fields) for row in rows[offset:offset + limit]]
+        }
+
+    @staticmethod
+    def project(record: Dict, fields) -> Dict:
+        return {field: record.get(field) for field in fields}
+
+    def get(self, vocab_id: int, fields=None, snapshot: Optional[IndexSnapshot] = None) -> Optional[Dict]:
+        snapshot = snapshot or self.snapshot
+        row = snapshot.rows_by_id.get(vocab_id)
+        if row is None:
+            return None
+        return self.project(snapshot.records[row], fields or DEFAULT_FIELDS)
+
+    def facets(self, snapshot: Optional[IndexSnapshot] = None) -> Dict:
+        """Number of vocabularies per value of every categorical column."""
+        snapshot = snapshot or self.snapshot
+        return {
+            'version': snapshot.version,
+            'total': len(snapshot.table),
+            **{name: {value: len(rows) for value, rows in groups.items()}
+               for name, groups in snapshot.rows_by_value.items()}
+        }
+
+
+def serve(index: VocabularyIndex, port: int, host: str = '127.0.0.1'):
+    """Serve the read-only API until interrupted.
+
+    GET /vocabularies?type=words&language=...&author=...&rating_min=3&users_max=100
+        &public=1&ids=1,2&sort=-users_count&offset=0&limit=100&fields=id,name
+    GET /vocabularies/<id>
+    GET /facets
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            # One snapshot per request, so a concurrent reload cannot mix versions
+            snapshot = index.refresh()
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            path = url.path.rstrip('/')
+
+            # Responses only depend on the dataset version and the request
+            etag = '"' + hashlib.sha1(f"{snapshot.version}|{self.path}".encode('utf-8')).hexdigest()[:20] + '"'
+            if etag in self.headers.get('If-None-Match', ''):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                return
+
+            try:
+                if path == '/vocabularies':
+                    payload = index.query(params, snapshot)
+                elif path.startswith('/vocabularies/'):
+                    fields = params.get('fields', [None])[-1]
+                    payload = index.get(int(path.rsplit('/', 1)[1]), fields.split(',') if fields else None, snapshot)
+                    if payload is None:
+                        self.send_error(404, "Vocabulary not found")
+                        return
+                elif path == '/facets':
+                    payload = index.facets(snapshot)
+                else:
+                    self.send_error(404)
+                    return
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+
+            body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving {len(index.snapshot.records)} vocabularies at http://{host}:{port}/vocabularies")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Local read-only HTTP API over an extracted vocabulary dataset")
+    arg_parser.add_argument('dataset', help="JSON dataset written by the extractor")
+    arg_parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="Interface to bind")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    index = VocabularyIndex(args.dataset)
+    print(f"Indexes built in {time.perf_counter() - start:.2f}s")
+    serve(index, args.port, args.host)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import io
+import random
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+EMPTY = object()
+
+
+class ReorderWindow:
+    """Fixed-size buffer that releases out-of-order results in ID order.
+
+    A result for ID i is stored in slot i % capacity. Only IDs in
+    [head, head + capacity) fit, so producers that run too far ahead of the
+    head wait in put() until it advances (backpressure). A single consumer
+    reads the head with peek() and releases it with advance().
+    """
+    def __init__(self, start_id: int, capacity: int = 1024):
+        self.capacity = capacity
+        self.slots = [EMPTY] * capacity
+        self.head = start_id
+        self.count = 0
+        self.blocked = 0
+        self.lock = threading.Lock()
+        # The consumer waits for the head slot; a blocked producer only for its own slot
+        self.head_ready = threading.Condition(self.lock)
+        self.slot_free = [threading.Condition(self.lock) for _ in range(capacity)]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def put(self, item_id: int, value, running: Callable[[], bool] = lambda: True) -> bool:
+        """Store a result, waiting while its ID is beyond the window; False if stopped first."""
+        with self.lock:
+            if item_id - self.head >= self.capacity:
+                self.blocked += 1
+                try:
+                    while item_id - self.head >= self.capacity:
+                        if not running():
+                            return False
+                        self.slot_free[item_id % self.capacity].wait(0.1)
+                finally:
+                    self.blocked -= 1
+            self.slots[item_id % self.capacity] = value
+            self.count += 1
+            if item_id == self.head:
+                self.head_ready.notify()
+            return True
+
+    def peek(self, timeout: Optional[float] = None) -> Optional[Tuple[int, object]]:
+        """(head ID, result) once the head result is in, or None after timeout."""
+        with self.lock:
+            if self.slots[self.head % self.capacity] is EMPTY:
+                self.head_ready.wait(timeout)
+            value = self.slots[self.head % self.capacity]
+            return None if value is EMPTY else (self.head, value)
+
+    def advance(self):
+        """Release the head slot and move on to the next ID."""
+        with self.lock:
+            slot = self.head % self.capacity
+            self.slots[slot] = EMPTY
+            self.count -= 1
+            self.head += 1
+            if self.blocked:
+                self.slot_free[slot].notify()
+
+    def items(self) -> List[Tuple[int, object]]:
+        """Buffered (ID, result) pairs in ID order."""
+        with self.lock:
+            return [
+                (item_id, self.slots[item_id % self.capacity])
+                for item_id in range(self.head, self.head + self.capacity)
+                if self.slots[item_id % self.capacity] is not EMPTY
+            ]
+
+    def close(self):
+        """Wake every waiter so it can notice a stop."""
+        with self.lock:
+            self.head_ready.notify_all()
+            for condition in self.slot_free:
+                condition.notify_all()
+
+
+def benchmark_locked_dict(workers: int, ids: int, latency: float, io_cost: float) -> dict:
+    """Previous collector: unbounded dict, one lock held while handling results."""
+    lock = threading.Lock()
+    pending = {}
+    state = {'next': 1, 'issued': 1, 'max_pending': 0, 'lock_wait': 0.0}
+    out = io.StringIO()
+
+    def worker():
+        while True:
+            with lock:
+                item_id = state['issued']
+                state['issued'] += 1
+            if item_id > ids:
+                return
+            time.sleep(random.expovariate(1 / latency))
+            started = time.perf_counter()
+            with lock:
+                state['lock_wait'] += time.perf_counter() - started
+                pending[item_id] = 200
+                state['max_pending'] = max(state['max_pending'], len(pending))
+                while state['next'] in pending:
+                    del pending[state['next']]
+                    out.write(f"{state['next']}\n")
+                    time.sleep(io_cost)
+                    state['next'] += 1
+
+    return run_threads(worker, workers, state)
+
+
+def benchmark_window(workers: int, ids: int, latency: float, io_cost: float, capacity: int) -> dict:
+    """ReorderWindow with a single consumer doing the I/O outside the window lock.
+
+    Worker wait includes backpressure once the window is full.
+    """
+    window = ReorderWindow(1, capacity)
+    id_lock = threading.Lock()
+    state = {'issued': 1, 'max_pending': 0, 'lock_wait': 0.0}
+    out = io.StringIO()
+
+    def worker():
+        while True:
+            with id_lock:
+                item_id = state['issued']
+                state['issued'] += 1
+            if item_id > ids:
+                return
+            time.sleep(random.expovariate(1 / latency))
+            started = time.perf_counter()
+            window.put(item_id, 200)
+            with id_lock:
+                state['lock_wait'] += time.perf_counter() - started
+
+    def consumer():
+        while window.head <= ids:
+            item = window.peek(0.1)
+            if item is None:
+                continue
+            state['max_pending'] = max(state['max_pending'], len(window))
+            window.advance()
+            out.write(f"{item[0]}\n")
+            time.sleep(io_cost)
+
+    collector = threading.Thread(target=consumer)
+    collector.start()
+    result = run_threads(worker, workers, state)
+    collector.join()
+    return result
+
+
+def run_threads(target, count: int, state: dict) -> dict:
+    started = time.perf_counter()
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'seconds': time.perf_counter() - started,
+        'max_pending': state['max_pending'],
+        'lock_wait': state['lock_wait'],
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Contention benchmark: unbounded locked dict vs reorder window")
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=[20, 100, 200], help="Worker counts to compare")
+    arg_parser.add_argument('--ids', type=int, default=20000, help="Results per run")
+    arg_parser.add_argument('--latency', type=float, default=0.01, help="Mean simulated probe latency in seconds")
+    arg_parser.add_argument('--io-cost', type=float, default=0.00002, help="Simulated per-result output cost in seconds")
+    arg_parser.add_argument('--capacity', type=int, default=1024, help="Reorder window size")
+    args = arg_parser.parse_args()
+
+    for workers in args.workers:
+        for name, run in (
+            ('locked dict', lambda: benchmark_locked_dict(workers, args.ids, args.latency, args.io_cost)),
+            ('window', lambda: benchmark_window(workers, args.ids, args.latency, args.io_cost, args.capacity)),
+        ):
+            result = run()
+            print(f"{workers:4d} workers | {name:11s} | {args.ids / result['seconds']:8.0f} results/s | "
+                  f"max pending {result['max_pending']:6d} | "
+                  f"wait {result['lock_wait'] * 1000 / args.ids:.3f} ms/result")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Least frequent letters of Russian and English text, the slowest to reach for most typists
+RARE_LETTERS = frozenset('ёъщфэцюжшzqxjkvЁЪЩФЭЦЮЖШZQXJKV')
+PUNCTUATION = frozenset('.,;:!?-–—…"\'«»„“”()[]{}/\\')
+DIGITS = frozenset('0123456789')
+
+FEATURE_DTYPE = np.dtype([
+    ('id', '<u4'),
+    ('entries', '<u4'),
+    ('chars', '<u4'),                 # Characters to type, spaces included
+    ('words', '<u4'),
+    ('avg_word_length', '<f4'),
+    ('punctuation_density', '<f4'),   # Share of non-space characters
+    ('digit_density', '<f4'),
+    ('capital_density', '<f4'),
+    ('rare_letter_density', '<f4'),   # Share of letters
+    ('entry_length_mean', '<f4'),
+    ('entry_length_p50', '<f4'),      # Interpolated percentiles
+    ('entry_length_p90', '<f4'),
+    ('entry_length_max', '<u4'),
+])
+FEATURES = FEATURE_DTYPE.names[1:]
+
+
+def compute_features(vocab_id: int, entries: Iterable[str]) -> tuple:
+    """One row of FEATURE_DTYPE from a vocabulary's content entries."""
+    lengths = []
+    words = 0
+    counts = Counter()
+    for entry in entries:
+        lengths.append(len(entry))
+        words += len(entry.split())
+        counts.update(entry)
+
+    chars = sum(lengths)
+    spaces = sum(count for char, count in counts.items() if char.isspace())
+    letters = capitals = punctuation = digits = rare = 0
+    for char, count in counts.items():
+        if char.isalpha():
+            letters += count
+            if char.isupper():
+                capitals += count
+            if char in RARE_LETTERS:
+                rare += count
+        elif char in DIGITS:
+            digits += count
+        elif char in PUNCTUATION:
+            punctuation += count
+
+    visible = max(chars - spaces, 1)
+    count = len(lengths)
+    lengths = np.asarray(lengths or [0])
+    return (
+        vocab_id, count, chars, words,
+        (chars - spaces - punctuation) / words if words else 0,
+        punctuation / visible, digits / visible, capitals / max(letters, 1), rare / max(letters, 1),
+        lengths.mean(), np.percentile(lengths, 50), np.percentile(lengths, 90), lengths.max()
+    )
+
+
+class TypingFeatures:
+    """Per-vocabulary typing-difficulty features as a fixed-width table sorted by ID.
+
+    Saved with np.save, so the table can be memory-mapped and filtered or
+    sorted column-wise without parsing anything.
+    """
+    def __init__(self, rows: Optional[np.ndarray] = None):
+        self.rows = rows if rows is not None else np.zeros(0, dtype=FEATURE_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, path: str) -> 'TypingFeatures':
+        if os.path.exists(path):
+            rows = np.load(path, mmap_mode='r')
+            # Tables written with an older layout are converted on load
+            return cls(rows if rows.dtype == FEATURE_DTYPE else rows.astype(FEATURE_DTYPE))
+        return cls()
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, np.asarray(self.rows))
+        os.replace(tmp_path, path)
+
+    def update(self, records: Iterable, retain_only: bool = False, retain_ids: Optional[Iterable[int]] = None) -> int:
+        """Compute features of every record with content, replacing older rows.
+
+        With retain_only, vocabularies absent from records are dropped; with
+        retain_ids, those not in that ID list. Records without any content
+        (a dataset read without its content store) never prune the table.
+        """
+        rows = np.array(
+            [compute_features(record['id'], record['content']) for record in records if record.get('content')],
+            dtype=FEATURE_DTYPE
+        )
+        if retain_only and len(rows):
+            self.rows = np.sort(rows, order='id')
+        else:
+            kept = np.asarray(self.rows)[~np.isin(self.rows['id'], rows['id'])]
+            if retain_ids is not None:
+                kept = kept[np.isin(kept['id'], np.fromiter(retain_ids, dtype=np.int64))]
+            self.rows = np.sort(np.concatenate((kept, rows)), order='id')
+        return len(rows)
+
+    def get(self, vocab_id: int) -> Optional[Dict]:
+        i = np.searchsorted(self.rows['id'], vocab_id)
+        if i < len(self.rows) and self.rows['id'][i] == vocab_id:
+            return {name: self.rows[name][i].item() for name in FEATURE_DTYPE.names}
+        return None
+
+    def select(self, sort: str = 'rare_letter_density', descending: bool = True,
+               ranges: Optional[Dict[str, tuple]] = None, limit: Optional[int] = None) -> np.ndarray:
+        """Rows within the inclusive (low, high) ranges, ordered by one feature."""
+        mask = np.ones(len(self.rows), dtype=bool)
+        for name, (low, high) in (ranges or {}).items():
+            if low is not None:
+                mask &= self.rows[name] >= low
+            if high is not None:
+                mask &= self.rows[name] <= high
+        rows = self.rows[mask]
+        order = np.argsort(rows[sort], kind='stable')
+        if descending:
+            order = order[::-1]
+        return rows[order[:limit]]
+
+    def to_columns(self) -> Dict[str, list]:
+        """Column → values, rounded for a compact JSON export."""
+        return {
+            # float32 values are widened first, or tolist() brings back digits like 0.13330000638961792
+            name: np.round(self.rows[name].astype(np.float64), 4).tolist() if self.rows[name].dtype.kind == 'f'
+            else self.rows[name].tolist()
+            for name in FEATURE_DTYPE.names
+        }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Typing-difficulty features of extracted vocabularies")
+    arg_parser.add_argument('features', help="Feature table (e.g. klavogonki_typing_features.npy)")
+    arg_parser.add_argument('--build', metavar='DATASET', help="Recompute features from a dataset written by the extractor")
+    arg_parser.add_argument('--content-store', metavar='DIR', help="Content store used by the dataset")
+    arg_parser.add_argument('--sort', choices=FEATURES, default='rare_letter_density', help="Feature to sort by")
+    arg_parser.add_argument('--ascending', action='store_true', help="Easiest first")
+    arg_parser.add_argument('--min', nargs=2, action='append', metavar=('FEATURE', 'VALUE'), default=[],
+                            help="Lower bound for a feature (repeatable)")
+    arg_parser.add_argument('--max', nargs=2, action='append', metavar=('FEATURE', 'VALUE'), default=[],
+                            help="Upper bound for a feature (repeatable)")
+    arg_parser.add_argument('--top', type=int, default=20, help="Number of vocabularies to print")
+    arg_parser.add_argument('--json', metavar='PATH', help="Export the table as columnar JSON")
+    args = arg_parser.parse_args()
+
+    features = TypingFeatures.load(args.features)
+    if args.build:
+        from KG_ValidVocabulariesExtractor import load_dataset
+
+        start = time.perf_counter()
+        records = load_dataset(args.build, args.content_store)
+        if not any('content' in record for record in records):
+            arg_parser.error(f"No record in {args.build} has content; pass --content-store if it was saved with one")
+        count = features.update(records, retain_only=True)
+        features.save(args.features)
+        print(f"✓ Features of {count} vocabularies computed in {time.perf_counter() - start:.2f}s → {args.features}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(features.to_columns(), f, separators=(',', ':'))
+        print(f"✓ Exported {len(features)} rows to {args.json}")
+
+    ranges = {}
+    for bound, index in ((args.min, 0), (args.max, 1)):
+        for name, value in bound:
+            if name not in FEATURES:
+                arg_parser.error(f"Unknown feature: {name}")
+            low_high = list(ranges.get(name, (None, None)))
+            low_high[index] = float(value)
+            ranges[name] = tuple(low_high)
+
+    start = time.perf_counter()
+    rows = features.select(args.sort, not args.ascending, ranges, args.top)
+    print(f"{len(features)} vocabularies, top {len(rows)} by {args.sort} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+    for row in rows:
+        print(f"  {row['id']}: {args.sort} {round(row[args.sort].item(), 3)} | {row['chars']} chars, {row['words']} words, "
+              f"avg word {row['avg_word_length']:.1f}, entry p90 {row['entry_length_p90']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,298 @@ import json
 import time
 import re
 import os
+import sys
+import argparse
+import heapq
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from KG_BatchConfig import install_stop_handlers, parse_args_with_config
+from KG_ContentIndex import ContentIndex
+from KG_Metrics import Metrics
+from KG_ProgressDisplay import ProgressDisplay
+from KG_VocabularyReport import write_report
+
+CYRILLIC_RE = re.compile(r'[а-яА-ЯёЁ]')
+LATIN_RE = re.compile(r'[a-zA-Z]')
+DIGIT_RE = re.compile(r'[0-9]')
+SYMBOL_RE = re.compile(r'[^\w\sа-яА-ЯёЁa-zA-Z0-9]')
+NON_SPACE_RE = re.compile(r'\S')
+
+class SamplingProfiler:
+    """Periodically samples the stacks of all threads (collapsed-stack dump)."""
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.sample_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+
+    def sample_loop(self):
+        own_id = threading.get_ident()
+        while self.running:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def hot_functions(self, limit: int = 20) -> List[Dict]:
+        """Functions most often on top of the stack (self time)."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {'function': name, 'samples': count, 'share': round(count / total, 4)}
+            for name, count in leaves.most_common(limit)
+        ]
+
+    def dump(self, path: str):
+        """Write stacks in collapsed format (flamegraph.pl / speedscope compatible)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """Records wall and CPU time per stage and per vocabulary for a run report."""
+    def __init__(self, slowest: int = 20, sample_path: Optional[str] = None):
+        self.lock = threading.Lock()
+        self.slowest = slowest
+        self.stages = {}
+        self.vocab_times = {}
+        self.sample_path = sample_path
+        self.sampler = SamplingProfiler() if sample_path else None
+        self.started_at = None
+        self.start_wall = 0.0
+        self.start_cpu = 0.0
+        self.end_wall = 0.0
+        self.end_cpu = 0.0
+
+    def start(self):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        if self.sampler:
+            self.sampler.start()
+
+    def stop(self):
+        self.end_wall = time.perf_counter()
+        self.end_cpu = time.process_time()
+        if self.sampler:
+            self.sampler.stop()
+
+    @contextmanager
+    def stage(self, name: str, vocab_id: Optional[int] = None):
+        """Time a block; CPU time is per-thread so network waits show up as wall only."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start, vocab_id)
+
+    def record(self, name: str, wall: float, cpu: float, vocab_id: Optional[int] = None):
+        with self.lock:
+            stage = self.stages.setdefault(name, {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'max_wall': 0.0})
+            stage['count'] += 1
+            stage['wall'] += wall
+            stage['cpu'] += cpu
+            stage['max_wall'] = max(stage['max_wall'], wall)
+
+            if vocab_id is not None:
+                vocab = self.vocab_times.setdefault(vocab_id, {})
+                vocab_stage = vocab.setdefault(name, {'count': 0, 'wall': 0.0, 'cpu': 0.0})
+                vocab_stage['count'] += 1
+                vocab_stage['wall'] += wall
+                vocab_stage['cpu'] += cpu
+
+    def report(self) -> Dict:
+        """Build the machine-readable run report."""
+        with self.lock:
+            stages = {
+                name: {
+                    'count': s['count'],
+                    'wall_total': round(s['wall'], 4),
+                    'wall_mean': round(s['wall'] / s['count'], 6) if s['count'] else 0,
+                    'wall_max': round(s['max_wall'], 4),
+                    'cpu_total': round(s['cpu'], 4)
+                }
+                for name, s in sorted(self.stages.items(), key=lambda item: item[1]['wall'], reverse=True)
+            }
+            timed = [(vid, st) for vid, st in self.vocab_times.items() if 'vocabulary' in st]
+            slowest = heapq.nlargest(self.slowest, timed, key=lambda item: item[1]['vocabulary']['wall'])
+
+        report = {
+            'started': self.started_at,
+            'wall_seconds': round(self.end_wall - self.start_wall, 3),
+            'cpu_seconds': round(self.end_cpu - self.start_cpu, 3),
+            'vocabularies': len(timed),
+            'stages': stages,
+            'slowest': [
+                {
+                    'id': vid,
+                    'wall': round(st['vocabulary']['wall'], 4),
+                    'cpu': round(st['vocabulary']['cpu'], 4),
+                    'attempts': st.get('network', {}).get('count', 0),
+                    'stages': {name: round(v['wall'], 4) for name, v in st.items() if name != 'vocabulary'}
+                }
+                for vid, st in slowest
+            ]
+        }
+        if self.sampler:
+            report['sampling'] = {
+                'interval': self.sampler.interval,
+                'samples': self.sampler.samples,
+                'dump': self.sample_path,
+                'hot_functions': self.sampler.hot_functions()
+            }
+        return report
+
+    def save(self, report_path: Optional[str]):
+        """Write the JSON report and the sampling dump (if enabled)."""
+        try:
+            if report_path:
+                with open(report_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.report(), f, ensure_ascii=False, indent=2)
+                print(f"✓ Profile report saved to {report_path}")
+            if self.sampler:
+                self.sampler.dump(self.sample_path)
+                print(f"✓ Sampling profile saved to {self.sample_path}")
+        except Exception as e:
+            print(f"Error saving profile: {e}")
+
+    def print_summary(self):
+        """Print the per-stage totals to the console."""
+        print("\nStage timings (wall / cpu, seconds):")
+        for name, s in self.report()['stages'].items():
+            print(f"  {name:<16} {s['wall_total']:>10.2f} / {s['cpu_total']:<10.2f} ×{s['count']}")
+
+
+class VocabularyRecord:
+    """Compact, dict-compatible record of a parsed vocabulary.
+
+    Uses __slots__ instead of a per-record dict, interns the repeating
+    categorical strings and keeps content as a tuple. The URL is derived
+    from the ID instead of being stored.
+    """
+    base_url = "https://klavogonki.ru/vocs/"
+    fields = (
+        'id', 'category', 'name', 'description', 'author', 'rating', 'users_count',
+        'history_count', 'comments_count', 'created', 'is_public', 'type', 'language', 'content'
+    )
+    interned_fields = ('category', 'author', 'created', 'type', 'language')
+    __slots__ = fields
+
+    def __init__(self, **values):
+        for field in self.fields:
+            value = values.get(field)
+            if field in self.interned_fields and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+        self.content = tuple(self.content or ())
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'VocabularyRecord':
+        return cls(**{field: data.get(field) for field in cls.fields})
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}{self.id}/"
+
+    def __getitem__(self, key: str):
+        if key == 'url':
+            return self.url
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self.fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key == 'url' or key in self.fields
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return ('id', 'url') + self.fields[1:]
+
+    def to_dict(self) -> Dict:
+        data = {key: self[key] for key in self.keys()}
+        data['content'] = list(self.content)
+        return data
+
+    def project(self, mode: str) -> Dict:
+        """Only the fields extracted in the given mode (see EXTRACTION_MODES)."""
+        if mode == 'full':
+            return self.to_dict()
+        return {field: self[field] for field in EXTRACTION_MODES[mode]}
+
+
+# Fields filled by each extraction mode; the partial modes skip the content
+# table (and language detection over it), counters also skip the description block
+EXTRACTION_MODES = {
+    'full': VocabularyRecord.fields,
+    'metadata': tuple(field for field in VocabularyRecord.fields if field not in ('content', 'language')),
+    'counters': ('id', 'category', 'rating', 'users_count', 'history_count', 'comments_count'),
+}
+
+
+def record_memory(records: List) -> Dict[str, int]:
+    """Estimate memory held by records versus the equivalent plain dict layout."""
+    compact_seen = set()
+
+    def compact_size(obj) -> int:
+        if id(obj) in compact_seen:
+            return 0
+        compact_seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    compact = 0
+    as_dicts = 0
+    for record in records:
+        compact += sys.getsizeof(record) + compact_size(record.content)
+        # Parsed strings are distinct objects per dict, so each one counts there
+        as_dicts += sys.getsizeof(record.to_dict()) + sys.getsizeof(list(record.content))
+        as_dicts += sys.getsizeof(record.url)
+        for field in VocabularyRecord.fields:
+            value = getattr(record, field)
+            if field == 'content':
+                entries = sum(sys.getsizeof(entry) for entry in value)
+                compact += entries
+                as_dicts += entries
+            elif value is not None and not isinstance(value, bool):
+                compact += compact_size(value)
+                as_dicts += sys.getsizeof(value)
+    return {'compact': compact, 'dict': as_dicts}
+
+
 class KlavogonkiVocabularyParser:
     def __init__(self):
         self.base_url = "https://klavogonki.ru/vocs/"
@@ -30,16 +317,57 @@ class KlavogonkiVocabularyParser:
         self.should_exit = False
         self.lock = threading.Lock()
         self.parsed_count = 0
+        self.profiler = None
+        self.total_count = 0
+        self.mode = 'full'
+        self.content_index_path = None
+        self.content_store_path = None
+        self.history_path = None
+        self.features_path = None
+        self.output_directory = None
+        # Progress region of a running parse_all_vocabularies, None otherwise
+        self.display = None
+        self.metrics = Metrics('kg_extractor')
+        self.metrics.register('responses_total', 'counter', 'Vocabulary page responses by HTTP status')
+        self.metrics.register('retries_total', 'counter', 'Page fetch retries by reason')
+        self.metrics.register('vocabularies_total', 'counter', 'Finished vocabularies by result')
+        self.metrics.register('fetch_seconds', 'histogram', 'Page request latency')
+        self.metrics.register('parse_seconds', 'histogram', 'HTML parse and field extraction time')
+        self.metrics.register('in_flight', 'gauge', 'Page requests in flight')
+        self.metrics.register('queue_depth', 'gauge', 'Vocabularies not yet finished')
+        self.metrics.gauge_callback('queue_depth', lambda: self.total_count - self.parsed_count)
+    
+    def timed_stage(self, name: str, vocab_id: Optional[int] = None):
+        """Profiler stage context, a no-op when profiling is disabled."""
+        if self.profiler:
+            return self.profiler.stage(name, vocab_id)
+        return nullcontext()
         
+    def count_characters(self, text: str) -> tuple:
+        """Count Cyrillic, Latin, digit, symbol and total non-space characters."""
+        return (
+            len(CYRILLIC_RE.findall(text)),
+            len(LATIN_RE.findall(text)),
+            len(DIGIT_RE.findall(text)),
+            len(SYMBOL_RE.findall(text)),
+            len(NON_SPACE_RE.findall(text))
+        )
+    
     def detect_language(self, text: str) -> str:
         """Detect if text is Cyrillic, Latin, Mixed, Digits, Symbols, or combination."""
-        cyrillic_count = len(re.findall(r'[а-яА-ЯёЁ]', text))
-        latin_count = len(re.findall(r'[a-zA-Z]', text))
-        digit_count = len(re.findall(r'[0-9]', text))
-        symbol_count = len(re.findall(r'[^\w\sа-яА-ЯёЁa-zA-Z0-9]', text))
-        
-        total_chars = len(re.findall(r'\S', text))
-        
+        return self.classify_language(*self.count_characters(text))
+    
+    def detect_language_entries(self, entries) -> str:
+        """Detect language over content entries without joining them into one string."""
+        totals = [0, 0, 0, 0, 0]
+        for entry in entries:
+            for i, count in enumerate(self.count_characters(entry)):
+                totals[i] += count
+        return self.classify_language(*totals)
+    
+    def classify_language(self, cyrillic_count: int, latin_count: int, digit_count: int,
+                          symbol_count: int, total_chars: int) -> str:
+        """Classify character counts into a language label."""
         if total_chars == 0:
             return "Пусто"
         
@@ -98,7 +426,8 @@ class KlavogonkiVocabularyParser:
     def fetch_vocabulary_ids(self) -> Dict[str, List[int]]:
         """Fetch vocabulary IDs from GitHub."""
         try:
-            response = self.session.get(self.github_url)
+            with self.timed_stage('fetch_ids'):
+                response = self.session.get(self.github_url)
             response.raise_for_status()
             data = json.loads(response.text)
             return data.get('validVocabularies', {})
@@ -106,144 +435,193 @@ class KlavogonkiVocabularyParser:
             print(f"Error fetching vocabulary IDs: {e}")
             return {}
     
-    def parse_vocabulary_page(self, vocab_id: int, category: str, max_retries: int = 10) -> Optional[Dict]:
+    def parse_vocabulary_html(self, vocab_id: int, category: str, html, mode: Optional[str] = None) -> VocabularyRecord:
+        """Extract vocabulary fields from page HTML (URL vocabularies get type 'url' and no content)."""
+        with self.metrics.timed('parse_seconds'):
+            return self.extract_fields(vocab_id, category, html, mode or self.mode)
+    
+    @staticmethod
+    def truncate_html(html, marker: str):
+        """Cut the page before marker so the rest is never parsed."""
+        if isinstance(html, bytes):
+            position = html.find(marker.encode('utf-8'))
+        else:
+            position = html.find(marker)
+        return html[:position] if position != -1 else html
+    
+    def extract_fields(self, vocab_id: int, category: str, html, mode: str = 'full') -> VocabularyRecord:
+        """Field extraction behind parse_vocabulary_html."""
+        # Partial modes stop parsing where the fields they need end
+        if mode == 'counters':
+            html = self.truncate_html(html, '<div class="user-content"')
+        elif mode == 'metadata':
+            html = self.truncate_html(html, '<div class="words"')
+        
+        with self.timed_stage('soup', vocab_id):
+            soup = BeautifulSoup(html, 'html.parser')
+        
+        vocab_data = {
+            'id': vocab_id,
+            'category': category,
+            'name': None,
+            'description': None,
+            'author': None,
+            'rating': 0,
+            'users_count': 0,
+            'history_count': 0,
+            'comments_count': 0,
+            'created': None,
+            'is_public': None,
+            'type': None,
+            'language': None,
+            'content': []
+        }
+        
+        # Extract name (title)
+        if mode != 'counters':
+            title_td = soup.find('td', class_='title')
+            if title_td:
+                title_text = title_td.get_text(strip=True)
+                vocab_data['name'] = re.split(r'\(\d+\)', title_text)[0].strip()
+        
+        # Extract rating
+        vocab_data['rating'] = self.extract_rating(soup)
+        
+        # Extract users count
+        fav_cnt = soup.find('span', id='fav_cnt')
+        if fav_cnt:
+            vocab_data['users_count'] = int(fav_cnt.get_text(strip=True))
+        
+        # Extract history count
+        history_link = soup.find('a', href=f'/vocs/{vocab_id}/history/')
+        if history_link:
+            history_sub = history_link.find_next('sub')
+            if history_sub:
+                vocab_data['history_count'] = int(history_sub.get_text(strip=True))
+        
+        # Extract comments count
+        comments_sub = soup.find('sub', id='cnt_comments')
+        if comments_sub:
+            vocab_data['comments_count'] = int(comments_sub.get_text(strip=True))
+        
+        if mode == 'counters':
+            return VocabularyRecord.from_dict(vocab_data)
+        
+        # Extract description
+        user_content = soup.find('div', class_='user-content')
+        if user_content:
+            desc_dd = user_content.find('dt', string='Описание:')
+            if desc_dd:
+                desc_dd = desc_dd.find_next('dd')
+                if desc_dd:
+                    vocab_data['description'] = desc_dd.get_text(strip=True)
+            
+            # Extract author
+            author_dd = user_content.find('dt', string='Автор:')
+            if author_dd:
+                author_dd = author_dd.find_next('dd')
+                if author_dd:
+                    author_link = author_dd.find('a')
+                    if author_link:
+                        vocab_data['author'] = author_link.get_text(strip=True)
+            
+            # Extract created date
+            created_dd = user_content.find('dt', string='Создан:')
+            if created_dd:
+                created_dd = created_dd.find_next('dd')
+                if created_dd:
+                    created_text = created_dd.get_text(strip=True)
+                    vocab_data['created'] = created_text.split('(')[0].strip()
+            
+            # Extract public status
+            public_dd = user_content.find('dt', string=re.compile(r'Публичный:'))
+            if public_dd:
+                public_dd = public_dd.find_next('dd')
+                if public_dd:
+                    public_text = public_dd.get_text(strip=True)
+                    vocab_data['is_public'] = public_text == 'Да'
+            
+            # Extract vocabulary type
+            type_dd = user_content.find('dt', string='Тип словаря:')
+            if type_dd:
+                type_dd = type_dd.find_next('dd')
+                if type_dd:
+                    type_text = type_dd.contents[0].strip() if type_dd.contents else ''
+                    type_text = re.sub(r'\s+', ' ', type_text).strip()
+                    if type_text == 'URL':
+                        vocab_data['type'] = 'url'
+                        return VocabularyRecord.from_dict(vocab_data)
+                    vocab_data['type'] = self.type_mapping.get(type_text, type_text)
+            
+            # Extract content
+            content_table = user_content.find('div', class_='words') if mode == 'full' else None
+            if content_table:
+                rows = content_table.find_all('tr')
+                for row in rows:
+                    text_td = row.find('td', class_='text')
+                    if text_td:
+                        text = text_td.get_text(strip=True)
+                        if text and text != '…':
+                            vocab_data['content'].append(text)
+                
+                if vocab_data['content']:
+                    with self.timed_stage('detect_language', vocab_id):
+                        vocab_data['language'] = self.detect_language_entries(vocab_data['content'])
+        
+        return VocabularyRecord.from_dict(vocab_data)
+    
+    def report(self, line: str):
+        """Per-vocabulary retry / failure line: the progress log during a full run, the console otherwise."""
+        if self.display:
+            self.display.log(line.strip())
+        else:
+            print(line)
+    
+    def parse_vocabulary_page(self, vocab_id: int, category: str, max_retries: int = 10) -> Optional[VocabularyRecord]:
         """Parse a single vocabulary page with retry logic."""
         url = f"{self.base_url}{vocab_id}/"
         
         for attempt in range(max_retries):
             try:
-                response = self.session.get(url, timeout=15)
+                with self.timed_stage('network', vocab_id), self.metrics.timed('fetch_seconds', in_flight='in_flight'):
+                    response = self.session.get(url, timeout=15)
+                self.metrics.inc('responses_total', status=response.status_code)
                 
                 if response.status_code == 403:
-                    print(f"  ⚠ 403 Forbidden for {vocab_id}, retrying ({attempt + 1}/{max_retries})...")
-                    time.sleep(2)
+                    self.metrics.inc('retries_total', reason='403')
+                    self.report(f"  ⚠ 403 Forbidden for {vocab_id}, retrying ({attempt + 1}/{max_retries})...")
+                    with self.timed_stage('retry_wait', vocab_id):
+                        time.sleep(2)
                     continue
                 
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                vocab_data = {
-                    'id': vocab_id,
-                    'url': url,
-                    'category': category,
-                    'name': None,
-                    'description': None,
-                    'author': None,
-                    'rating': 0,
-                    'users_count': 0,
-                    'history_count': 0,
-                    'comments_count': 0,
-                    'created': None,
-                    'is_public': None,
-                    'type': None,
-                    'language': None,
-                    'content': []
-                }
-                
-                # Extract name (title)
-                title_td = soup.find('td', class_='title')
-                if title_td:
-                    title_text = title_td.get_text(strip=True)
-                    vocab_data['name'] = re.split(r'\(\d+\)', title_text)[0].strip()
-                
-                # Extract rating
-                vocab_data['rating'] = self.extract_rating(soup)
-                
-                # Extract users count
-                fav_cnt = soup.find('span', id='fav_cnt')
-                if fav_cnt:
-                    vocab_data['users_count'] = int(fav_cnt.get_text(strip=True))
-                
-                # Extract history count
-                history_link = soup.find('a', href=f'/vocs/{vocab_id}/history/')
-                if history_link:
-                    history_sub = history_link.find_next('sub')
-                    if history_sub:
-                        vocab_data['history_count'] = int(history_sub.get_text(strip=True))
-                
-                # Extract comments count
-                comments_sub = soup.find('sub', id='cnt_comments')
-                if comments_sub:
-                    vocab_data['comments_count'] = int(comments_sub.get_text(strip=True))
-                
-                # Extract description
-                user_content = soup.find('div', class_='user-content')
-                if user_content:
-                    desc_dd = user_content.find('dt', string='Описание:')
-                    if desc_dd:
-                        desc_dd = desc_dd.find_next('dd')
-                        if desc_dd:
-                            vocab_data['description'] = desc_dd.get_text(strip=True)
-                    
-                    # Extract author
-                    author_dd = user_content.find('dt', string='Автор:')
-                    if author_dd:
-                        author_dd = author_dd.find_next('dd')
-                        if author_dd:
-                            author_link = author_dd.find('a')
-                            if author_link:
-                                vocab_data['author'] = author_link.get_text(strip=True)
-                    
-                    # Extract created date
-                    created_dd = user_content.find('dt', string='Создан:')
-                    if created_dd:
-                        created_dd = created_dd.find_next('dd')
-                        if created_dd:
-                            created_text = created_dd.get_text(strip=True)
-                            vocab_data['created'] = created_text.split('(')[0].strip()
-                    
-                    # Extract public status
-                    public_dd = user_content.find('dt', string=re.compile(r'Публичный:'))
-                    if public_dd:
-                        public_dd = public_dd.find_next('dd')
-                        if public_dd:
-                            public_text = public_dd.get_text(strip=True)
-                            vocab_data['is_public'] = public_text == 'Да'
-                    
-                    # Extract vocabulary type
-                    type_dd = user_content.find('dt', string='Тип словаря:')
-                    if type_dd:
-                        type_dd = type_dd.find_next('dd')
-                        if type_dd:
-                            type_text = type_dd.contents[0].strip() if type_dd.contents else ''
-                            type_text = re.sub(r'\s+', ' ', type_text).strip()
-                            if type_text == 'URL':
-                                print(f"  ⚠ Skipping vocabulary {vocab_id}: URL type")
-                                return None
-                            vocab_data['type'] = self.type_mapping.get(type_text, type_text)
-                    
-                    # Extract content
-                    content_table = user_content.find('div', class_='words')
-                    if content_table:
-                        rows = content_table.find_all('tr')
-                        all_text = []
-                        for row in rows:
-                            text_td = row.find('td', class_='text')
-                            if text_td:
-                                text = text_td.get_text(strip=True)
-                                if text and text != '…':
-                                    vocab_data['content'].append(text)
-                                    all_text.append(text)
-                        
-                        if all_text:
-                            combined_text = ' '.join(all_text)
-                            vocab_data['language'] = self.detect_language(combined_text)
-                
-                return vocab_data
+                record = self.parse_vocabulary_html(vocab_id, category, response.content)
+                if record.type == 'url':
+                    self.report(f"  ⚠ Skipping vocabulary {vocab_id}: URL type")
+                    return None
+                return record
                 
             except requests.exceptions.RequestException as e:
+                self.metrics.inc('responses_total', status='error')
                 if attempt < max_retries - 1:
-                    print(f"  ⚠ Error fetching {vocab_id}: {e}, retrying ({attempt + 1}/{max_retries})...")
-                    time.sleep(2)
+                    self.metrics.inc('retries_total', reason='error')
+                    self.report(f"  ⚠ Error fetching {vocab_id}: {e}, retrying ({attempt + 1}/{max_retries})...")
+                    with self.timed_stage('retry_wait', vocab_id):
+                        time.sleep(2)
                 else:
-                    print(f"  ✗ Failed to fetch {vocab_id} after {max_retries} attempts: {e}")
+                    self.report(f"  ✗ Failed to fetch {vocab_id} after {max_retries} attempts: {e}")
                     return None
             except Exception as e:
-                print(f"  ✗ Error parsing {vocab_id}: {e}")
+                self.report(f"  ✗ Error parsing {vocab_id}: {e}")
                 return None
         
         return None
     
+    def parse_vocabulary_timed(self, vocab_id: int, category: str) -> Optional[VocabularyRecord]:
+        """Parse a vocabulary page, recording its total time when profiling."""
+        with self.timed_stage('vocabulary', vocab_id):
+            return self.parse_vocabulary_page(vocab_id, category)
+    
     def calculate_column_widths(self, data: List[Dict]) -> Dict[str, int]:
         """Calculate maximum column widths for alignment (used only for file output)."""
         if not data:
@@ -296,9 +674,8 @@ class KlavogonkiVocabularyParser:
         
         return f"{name_line}\n{data_line}"
     
-    def write_vocabularies_by_type(self, f, vocabs: List[Dict], widths: Dict[str, int]):
-        """Write vocabularies grouped by type to file."""
-        # Group vocabularies by type
+    def group_by_type(self, vocabs: List[Dict]) -> List[tuple]:
+        """(type, vocabularies) pairs, predefined types first, then the rest alphabetically."""
         by_type = {}
         for vocab in vocabs:
             vtype = vocab.get('type', 'unknown')
@@ -306,44 +683,185 @@ class KlavogonkiVocabularyParser:
                 by_type[vtype] = []
             by_type[vtype].append(vocab)
         
-        # Write types in predefined order
-        for vtype in self.type_order:
-            if vtype not in by_type:
-                continue
-            
-            type_vocabs = by_type[vtype]
-            type_name_ru = self.type_mapping_reverse.get(vtype, vtype)
-            
-            f.write(f"  [{type_name_ru}] ({len(type_vocabs)} шт.)\n")
-            
-            for vocab in type_vocabs:
-                line = self.format_vocabulary_line(vocab, widths)
-                f.write(line + "\n")
+        ordered = [vtype for vtype in self.type_order if vtype in by_type]
+        ordered += [vtype for vtype in sorted(by_type.keys()) if vtype not in self.type_order]
+        return [(vtype, by_type[vtype]) for vtype in ordered]
+    
+    def render_type_section(self, vtype: str, type_vocabs: List[Dict], widths: Dict[str, int]) -> str:
+        """Text report section for one type of one author."""
+        type_name_ru = self.type_mapping_reverse.get(vtype, vtype)
+        lines = [f"  [{type_name_ru}] ({len(type_vocabs)} шт.)"]
+        for vocab in type_vocabs:
+            lines.append(self.format_vocabulary_line(vocab, widths))
+        return '\n'.join(lines) + "\n\n"
+    
+    def write_vocabularies_by_type(self, f, vocabs: List[Dict], widths: Dict[str, int]):
+        """Write vocabularies grouped by type to file."""
+        for vtype, type_vocabs in self.group_by_type(vocabs):
+            f.write(self.render_type_section(vtype, type_vocabs, widths))
+    
+    def serialize_record(self, record: VocabularyRecord) -> Dict:
+        """Dataset form of a record; content is replaced by its entry count when kept in the content store."""
+        data = record.project(self.mode)
+        if self.content_store_path and 'content' in data:
+            data['entries'] = len(data.pop('content'))
+        return data
+    
+    def store_content(self, records: List):
+        """Write record content to the deduplicated content store, if one is configured."""
+        if self.content_store_path and self.mode == 'full':
+            from KG_ContentStore import ContentStore  # NumPy is only needed when a store is used
             
-            f.write("\n")
+            with self.timed_stage('content_store'):
+                ContentStore(self.content_store_path).update(records)
+    
+    def save_dataset(self, data: List[Dict], filepath: Path):
+        """Save parsed records as a JSON dataset for later analysis."""
+        try:
+            self.store_content(data)
+            # Written next to the dataset and swapped in, so readers never see a partial file
+            tmp_path = f"{filepath}.tmp"
+            with self.timed_stage('save_dataset'):
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'generated': datetime.now().isoformat(timespec='seconds'),
+                        'vocabularies': data
+                    }, f, ensure_ascii=False, default=self.serialize_record)
+                os.replace(tmp_path, filepath)
+            # A full save supersedes any incremental updates
+            updates_path = dataset_updates_path(filepath)
+            if os.path.exists(updates_path):
+                os.remove(updates_path)
+            print(f"✓ Набор данных сохранен в {filepath}")
+        except Exception as e:
+            print(f"Ошибка сохранения набора данных: {e}")
+    
+    def append_to_dataset(self, records: List, filepath) -> None:
+        """Append records to the dataset's update log instead of rewriting the dataset."""
+        self.store_content(records)
+        with open(dataset_updates_path(filepath), 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=self.serialize_record) + "\n")
+    
+    def extract_incremental(self, tasks: List[tuple], dataset_path) -> List[VocabularyRecord]:
+        """Fetch and parse only the given (vocab_id, category) pairs and append them to the dataset."""
+        records = []
+        for vocab_id, category in tasks:
+            record = self.parse_vocabulary_timed(vocab_id, category)
+            if record:
+                records.append(record)
+                print(f"  ✓ {self.format_console_line(record)}")
+            else:
+                print(f"  ✗ {vocab_id}: Failed to parse")
+        if records:
+            self.append_to_dataset(records, dataset_path)
+            self.update_content_index(records)
+            self.update_typing_features(records)
+            self.record_history(records)
+        return records
+    
+    def record_history(self, records: List):
+        """Append this run's counters to the counter time series."""
+        if not self.history_path or not records:
+            return
+        from KG_CounterHistory import CounterHistory  # NumPy is only needed for the history
         
-        # Write any remaining types not in predefined order
-        for vtype in sorted(by_type.keys()):
-            if vtype in self.type_order:
-                continue
-            
-            type_vocabs = by_type[vtype]
-            type_name_ru = self.type_mapping_reverse.get(vtype, vtype)
-            
-            f.write(f"  [{type_name_ru}] ({len(type_vocabs)} шт.)\n")
-            
-            for vocab in type_vocabs:
-                line = self.format_vocabulary_line(vocab, widths)
-                f.write(line + "\n")
+        try:
+            with self.timed_stage('history'):
+                count = CounterHistory(self.history_path).append(records)
+            print(f"✓ Счетчики {count} словарей добавлены в историю {self.history_path}")
+        except Exception as e:
+            print(f"Ошибка записи истории счетчиков: {e}")
+    
+    def update_typing_features(self, records: List, retain_ids=None):
+        """Recompute typing-difficulty features from the content just parsed (retain_ids as in update_content_index)."""
+        if not self.features_path or self.mode != 'full':
+            return
+        from KG_TypingFeatures import TypingFeatures  # NumPy is only needed for the feature table
+        
+        try:
+            with self.timed_stage('typing_features'):
+                features = TypingFeatures.load(self.features_path)
+                count = features.update(records, retain_ids=retain_ids)
+                features.save(self.features_path)
+            print(f"✓ Признаки сложности {count} словарей сохранены в {self.features_path}")
+        except Exception as e:
+            print(f"Ошибка расчета признаков сложности: {e}")
+    
+    def update_content_index(self, records: List, retain_ids=None):
+        """Re-index the content of freshly extracted vocabularies.
+        
+        retain_ids drops indexed vocabularies missing from that ID list; pass it
+        only after a complete run, so failed or skipped IDs keep their entries.
+        Without it the records are appended to the index's delta log, which is
+        merged into the index only once it has grown large.
+        """
+        if not self.content_index_path or self.mode != 'full':
+            return
+        try:
+            with self.timed_stage('content_index'):
+                if retain_ids is None:
+                    count = ContentIndex.append(self.content_index_path, records)
+                    if not ContentIndex.needs_merge(self.content_index_path):
+                        print(f"✓ Полнотекстовый индекс: {count} словарей добавлено в журнал изменений")
+                        return
+                index = ContentIndex.load(self.content_index_path)
+                index.update(records, retain_ids=retain_ids)
+                index.save(self.content_index_path)
+            print(f"✓ Полнотекстовый индекс обновлен: {self.content_index_path} ({len(index)} словарей)")
+        except Exception as e:
+            print(f"Ошибка обновления полнотекстового индекса: {e}")
+    
+    def configure_paths(self, output_dir, content_index=None, history=None, features=None):
+        """Content index, counter history and feature table paths, defaulting to output_dir."""
+        self.content_index_path = content_index or str(Path(output_dir) / "klavogonki_content_index.json.gz")
+        self.history_path = history or str(Path(output_dir) / "klavogonki_counter_history")
+        self.features_path = features or str(Path(output_dir) / "klavogonki_typing_features.npy")
+    
+    def follow_handoff(self, queue_path, dataset_path, poll_interval: float = 1.0, stop=None):
+        """Tail the scanner's handoff queue and extract each approved ID as it arrives.
+        
+        The read position is kept in <queue>.offset so a restart resumes where it stopped.
+        """
+        offset_path = f"{queue_path}.offset"
+        offset = 0
+        if os.path.exists(offset_path):
+            with open(offset_path, 'r', encoding='utf-8') as f:
+                offset = int(f.read().strip() or 0)
+        
+        print(f"Following {queue_path} → {dataset_path}")
+        while not self.should_exit and not (stop and stop()):
+            tasks = []
+            if os.path.exists(queue_path):
+                with open(queue_path, 'rb') as f:
+                    f.seek(offset)
+                    for line in f:
+                        # Leave a partially written last line for the next poll
+                        if not line.endswith(b"\n"):
+                            break
+                        offset += len(line)
+                        try:
+                            entry = json.loads(line)
+                            tasks.append((int(entry['id']), entry.get('type') or 'unknown'))
+                        except (ValueError, KeyError, TypeError) as e:
+                            # Skipped for good: the offset already points past it
+                            print(f"  ⚠ Skipping malformed queue line {line[:80]!r}: {e}")
             
-            f.write("\n")
+            if tasks:
+                self.extract_incremental(tasks, dataset_path)
+                with open(offset_path, 'w', encoding='utf-8') as f:
+                    f.write(str(offset))
+            else:
+                time.sleep(poll_interval)
     
-    def save_to_desktop(self, data: List[Dict], filename: str = "klavogonki_vocabularies"):
-        """Save parsed data to Desktop as both text and HTML files, grouped by author and type."""
-        desktop = Path.home() / "Desktop"
+    def save_to_desktop(self, data: List[Dict], filename: str = "klavogonki_vocabularies", embed_report: bool = False):
+        """Save parsed data to Desktop (or output_directory) as text and HTML reports plus a JSON dataset."""
+        desktop = Path(self.output_directory) if self.output_directory else Path.home() / "Desktop"
         txt_filepath = desktop / f"{filename}.txt"
         html_filepath = desktop / f"{filename}.html"
         
+        self.save_dataset(data, desktop / f"{filename}.json")
+        
         # Group vocabularies by author
         by_author = {}
         for vocab in data:
@@ -360,12 +878,14 @@ class KlavogonkiVocabularyParser:
         
         try:
             # Save TXT file
-            with open(txt_filepath, 'w', encoding='utf-8') as f:
+            with self.timed_stage('save_txt'), open(txt_filepath, 'w', encoding='utf-8') as f:
                 f.write("=" * 150 + "\n")
                 f.write("РЕЗУЛЬТАТЫ ПАРСИНГА СЛОВАРЕЙ КЛАВОГОНОК\n")
                 f.write(f"Всего распарсено: {len(data)} словарей от {len(by_author)} авторов\n")
                 f.write("=" * 150 + "\n\n")
                 
+                # Rendered in full every time: formatting is cheaper than hashing and
+                # reading back per-author cache files for every record
                 for author in sorted_authors:
                     vocabs = by_author[author]
                     
@@ -377,416 +897,16 @@ class KlavogonkiVocabularyParser:
             
             print(f"\n✓ Текстовый файл сохранен в {txt_filepath}")
             
-            # Save HTML file
-            with open(html_filepath, 'w', encoding='utf-8') as f:
-                f.write("""<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Словари Клавогонок</title>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/tabulator-tables@6.3.0/dist/css/tabulator.min.css">
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            min-height: 100vh;
-        }
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            padding: 40px;
-        }
-        .header {
-            text-align: center;
-            margin-bottom: 40px;
-            padding-bottom: 20px;
-            border-bottom: 3px solid #667eea;
-        }
-        .header h1 {
-            color: #667eea;
-            font-size: 2.5em;
-            margin-bottom: 15px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-        }
-        .header .stats {
-            font-size: 1.2em;
-            color: #555;
-            margin-top: 10px;
-        }
-        .search-container {
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            gap: 15px;
-            margin: 30px 0;
-            padding: 15px;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 100;
-        }
-        .search-container select,
-        .search-container input {
-            padding: 12px 20px;
-            border: 2px solid #e9ecef;
-            border-radius: 25px;
-            font-size: 1em;
-            transition: all 0.3s ease;
-            outline: none;
-        }
-        .search-container select:focus,
-        .search-container input:focus {
-            border-color: #667eea;
-            box-shadow: 0 0 0 3px rgba(102,126,234,0.1);
-        }
-        .author-section {
-            margin-bottom: 50px;
-            background: linear-gradient(to right, #f8f9fa, #ffffff);
-            border-radius: 10px;
-            padding: 25px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.07);
-        }
-        .author-header {
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            box-shadow: 0 4px 10px rgba(102, 126, 234, 0.3);
-        }
-        .author-header h2 {
-            font-size: 1.8em;
-            margin-bottom: 5px;
-        }
-        .author-header .count {
-            font-size: 1.1em;
-            opacity: 0.9;
-        }
-        .type-section {
-            margin-bottom: 25px;
-        }
-        .type-header {
-            background: #f1f3f5;
-            padding: 12px 20px;
-            border-radius: 6px;
-            margin-bottom: 15px;
-            border-left: 4px solid #667eea;
-            font-weight: 600;
-            color: #495057;
-            font-size: 1.1em;
-        }
-        .tabulator-table {
-            width: 100%;
-            background: white;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        }
-        .tabulator .tabulator-header {
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-        }
-        .tabulator .tabulator-header .tabulator-col {
-            padding: 15px 12px;
-            text-align: left;
-            font-weight: 600;
-            font-size: 0.95em;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        .tabulator .tabulator-row .tabulator-cell {
-            padding: 12px;
-            border-bottom: 1px solid #e9ecef;
-            font-size: 0.95em;
-        }
-        .tabulator .tabulator-row:last-child .tabulator-cell {
-            border-bottom: none;
-        }
-        .tabulator .tabulator-row {
-            transition: background-color 0.2s ease;
-        }
-        .tabulator .tabulator-row:hover {
-            background-color: #f8f9fa;
-        }
-        .vocab-id {
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 600;
-            padding: 5px 10px;
-            border-radius: 4px;
-            transition: all 0.2s ease;
-            display: inline-block;
-        }
-        .vocab-id:hover {
-            background: #667eea;
-            color: white;
-            transform: translateX(3px);
-        }
-        .rating {
-            color: #ffc107;
-            font-weight: 600;
-        }
-        .rating::after {
-            content: ' ⭐';
-        }
-        .badge {
-            padding: 4px 10px;
-            border-radius: 12px;
-            font-size: 0.85em;
-            font-weight: 600;
-            display: inline-block;
-        }
-        .badge-open {
-            background: #d4edda;
-            color: #155724;
-        }
-        .badge-closed {
-            background: #f8d7da;
-            color: #721c24;
-        }
-        .lang-badge {
-            padding: 4px 10px;
-            border-radius: 12px;
-            font-size: 0.85em;
-            font-weight: 600;
-            background: #e7f5ff;
-            color: #1864ab;
-        }
-        .stat {
-            color: #6c757d;
-            font-size: 0.9em;
-        }
-        @media (max-width: 1200px) {
-            .tabulator {
-                font-size: 0.85em;
-            }
-            .tabulator .tabulator-col, .tabulator .tabulator-row .tabulator-cell {
-                padding: 10px 8px;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📚 Словари Клавогонок</h1>
-            <div class="stats">
-                <strong>Всего распарсено:</strong> """ + str(len(data)) + """ словарей от """ + str(len(by_author)) + """ авторов
-            </div>
-        </div>
-        <div class="search-container">
-            <select id="searchMode">
-                <option value="author">Поиск по автору</option>
-                <option value="id">Поиск по ID</option>
-                <option value="name">Поиск по названию</option>
-                <option value="language">Поиск по языку</option>
-                <option value="rating">Поиск по рейтингу</option>
-                <option value="users">Поиск по используют</option>
-                <option value="comments">Поиск по комментариям</option>
-                <option value="created">Поиск по создан</option>
-                <option value="access">Поиск по доступу</option>
-                <option value="entries">Поиск по записям</option>
-            </select>
-            <input type="text" id="searchInput" placeholder="Введите поисковый запрос...">
-        </div>
-""")
-                
-                table_scripts = []
-                counter = 0
-                
-                for author in sorted_authors:
-                    vocabs = by_author[author]
-                    
-                    f.write(f"""
-        <div class="author-section">
-            <div class="author-header">
-                <h2>👤 {author}</h2>
-                <div class="count">{len(vocabs)} словарей</div>
-            </div>
-""")
-                    
-                    # Group vocabularies by type
-                    by_type = {}
-                    for vocab in vocabs:
-                        vtype = vocab.get('type', 'unknown')
-                        if vtype not in by_type:
-                            by_type[vtype] = []
-                        by_type[vtype].append(vocab)
-                    
-                    # Write types in predefined order
-                    all_types = []
-                    for vtype in self.type_order:
-                        if vtype in by_type:
-                            all_types.append(vtype)
-                    # Add remaining types
-                    for vtype in sorted(by_type.keys()):
-                        if vtype not in all_types:
-                            all_types.append(vtype)
-                    
-                    for vtype in all_types:
-                        type_vocabs = by_type[vtype]
-                        type_name_ru = self.type_mapping_reverse.get(vtype, vtype)
-                        counter += 1
-                        unique_id = f"table_{counter}"
-                        
-                        data_list = []
-                        for vocab in type_vocabs:
-                            data_list.append({
-                                'id': vocab['id'],
-                                'url': vocab['url'],
-                                'name': vocab.get('name', 'N/A'),
-                                'language': vocab.get('language', 'N/A'),
-                                'rating': vocab['rating'],
-                                'users_count': vocab.get('users_count', 0),
-                                'comments_count': vocab.get('comments_count', 0),
-                                'created': vocab.get('created', 'N/A'),
-                                'is_public': vocab.get('is_public', False),
-                                'access_text': 'Открытый' if vocab.get('is_public') else 'Закрытый',
-                                'entries': len(vocab.get('content', []))
-                            })
-                        
-                        f.write(f"""
-            <div class="type-section">
-                <div class="type-header">📖 {type_name_ru} ({len(type_vocabs)} шт.)</div>
-                <div id="{unique_id}" class="tabulator-table"></div>
-            </div>
-""")
-                        
-                        table_scripts.append(f"var tableData_{unique_id} = {json.dumps(data_list)};")
-                        table_scripts.append(f"""
-var table_{unique_id} = new Tabulator("#{unique_id}", {{
-    data: tableData_{unique_id},
-    layout: "fitColumns",
-    columns: [
-        {{title:"ID", field:"id", formatter: function(cell){{ return `<a href="${{cell.getRow().getData().url}}" target="_blank" class="vocab-id">${{cell.getValue()}}</a>`; }}}},
-        {{title:"Название", field:"name", formatter: function(cell){{ var val = cell.getValue(); return `<strong title="${{val}}">${{val.length > 60 ? val.slice(0,57)+'...' : val}}</strong>`; }}}},
-        {{title:"Язык", field:"language", formatter: function(cell){{ return `<span class="lang-badge">${{cell.getValue()}}</span>`; }}}},
-        {{title:"Рейтинг", field:"rating", formatter: function(cell){{ return `<span class="rating">${{cell.getValue()}}</span>`; }}}},
-        {{title:"Используют", field:"users_count", cssClass:"stat"}},
-        {{title:"Комментариев", field:"comments_count", cssClass:"stat"}},
-        {{title:"Создан", field:"created", cssClass:"stat"}},
-        {{title:"Доступ", field:"access_text", formatter: function(cell){{ var data = cell.getRow().getData(); var badge = data.is_public ? 'badge-open' : 'badge-closed'; return `<span class="badge ${{badge}}">${{cell.getValue()}}</span>`; }}}},
-        {{title:"Записей", field:"entries", cssClass:"stat"}},
-    ],
-    height: Math.min(400, 50 + (tableData_{unique_id}.length * 40))  // Dynamic height with 400px max
-}});
-tables.push(table_{unique_id});
-""")
-                    
-                    f.write("""
-        </div>
-""")
-                
-                f.write("""
-    </div>
-    <script src="https://cdn.jsdelivr.net/npm/tabulator-tables@6.3.0/dist/js/tabulator.min.js"></script>
-    <script>
-        var tables = [];
-        """ + '\n'.join(table_scripts) + """
-    </script>
-    <script>
-        document.addEventListener('DOMContentLoaded', () => {
-            const searchInput = document.getElementById('searchInput');
-            const searchMode = document.getElementById('searchMode');
-
-            function filterContent() {
-                const term = searchInput.value.toLowerCase().trim();
-                const mode = searchMode.value;
-
-                if (!term) {
-                    tables.forEach(t => t.clearFilter());
-                    document.querySelectorAll('.author-section, .type-section').forEach(el => el.style.display = '');
-                } else if (mode === 'author') {
-                    tables.forEach(t => t.clearFilter());
-                    const authors = document.querySelectorAll('.author-section');
-                    authors.forEach(author => {
-                        const authorName = author.querySelector('.author-header h2').textContent.toLowerCase();
-                        const shouldShowAuthor = authorName.includes(term);
-                        author.style.display = shouldShowAuthor ? '' : 'none';
-                        if (shouldShowAuthor) {
-                            author.querySelectorAll('.type-section').forEach(type => type.style.display = '');
-                        }
-                    });
-                } else {
-                    const fieldMap = {
-                        'id': 'id',
-                        'name': 'name',
-                        'language': 'language',
-                        'rating': 'rating',
-                        'users': 'users_count',
-                        'comments': 'comments_count',
-                        'created': 'created',
-                        'access': 'access_text',
-                        'entries': 'entries',
-                    };
-                    const numberFields = ['id', 'rating', 'users_count', 'comments_count', 'entries'];
-
-                    const field = fieldMap[mode];
-                    if (field) {
-                        const parsedTerm = parseFloat(term);
-                        const isNumber = !isNaN(parsedTerm);
-                        const filterType = numberFields.includes(field) && isNumber ? '=' : 'like';
-                        const filterValue = isNumber ? parsedTerm : term;
-                        tables.forEach(table => {
-                            table.setFilter(field, filterType, filterValue);
-                        });
-
-                        document.querySelectorAll('.type-section').forEach(type => {
-                            const tableEl = type.querySelector('.tabulator-table');
-                            if (tableEl) {
-                                const table = Tabulator.findTable('#' + tableEl.id)[0];
-                                if (table) {
-                                    const visibleRows = table.getRows('active').length;
-                                    type.style.display = visibleRows > 0 ? '' : 'none';
-                                }
-                            }
-                        });
-
-                        const authors = document.querySelectorAll('.author-section');
-                        authors.forEach(author => {
-                            const visibleTypes = author.querySelectorAll('.type-section:not([style*="display: none"])').length;
-                            author.style.display = visibleTypes > 0 ? '' : 'none';
-                        });
-                    }
-                }
-
-                // Adjust table heights for visible tables
-                tables.forEach(table => {
-                    table.redraw();
-                    const typeSection = table.element.closest('.type-section');
-                    if (typeSection && typeSection.style.display !== 'none') {
-                        const headerHeight = table.header.element.offsetHeight || 50;
-                        const rowsHeight = table.rowManager.element.offsetHeight;
-                        const calculatedHeight = headerHeight + rowsHeight;
-                        const newHeight = Math.min(400, calculatedHeight);
-                        table.setHeight(newHeight);
-                        table.redraw(true);
-                    }
-                });
-            }
-
-            searchInput.addEventListener('input', filterContent);
-            searchMode.addEventListener('change', filterContent);
-            filterContent(); // Initial call to set heights
-        });
-    </script>
-</body>
-</html>
-""")
+            # Save HTML report (single virtualized table, dataset written once).
+            # There is nothing per author to cache here: the page is static and
+            # the data file is one serialization of the dataset
+            with self.timed_stage('save_html'):
+                data_filepath = write_report(data, html_filepath, embed=embed_report,
+                                             type_order=self.type_order, type_names=self.type_mapping_reverse)
             
             print(f"✓ HTML файл сохранен в {html_filepath}")
+            if data_filepath:
+                print(f"✓ Данные отчета сохранены в {data_filepath}")
             print(f"✓ Сгруппировано по {len(by_author)} авторам")
                     
         except Exception as e:
@@ -836,8 +956,13 @@ tables.push(table_{unique_id});
             f"Записей: {len(vocab.get('content', []))}"
         )
     
-    def parse_all_vocabularies(self, delay: float = 0.5, max_workers: int = 10) -> List[Dict]:
-        """Parse all vocabularies from all categories using multiple threads."""
+    def parse_all_vocabularies(self, delay: float = 0.5, max_workers: int = 10,
+                               log_path: Optional[str] = None, interactive: bool = True) -> List[Dict]:
+        """Parse all vocabularies from all categories using multiple threads.
+        
+        Console shows an aggregated progress region; per-vocabulary lines go to log_path.
+        Without interactive the 'q' key listener is not started (stop via should_exit).
+        """
         vocab_ids = self.fetch_vocabulary_ids()
         
         # Flatten all vocab IDs with their categories
@@ -847,20 +972,26 @@ tables.push(table_{unique_id});
                 tasks.append((vocab_id, category))
         
         total_count = len(tasks)
+        self.total_count = total_count
         self.parsed_count = 0
         
         # Start exit listener thread
-        exit_thread = threading.Thread(target=self.listen_for_exit, daemon=True)
-        exit_thread.start()
-        
-        print("\nPress 'q' to exit and save current progress\n")
+        if interactive:
+            exit_thread = threading.Thread(target=self.listen_for_exit, daemon=True)
+            exit_thread.start()
+            print("\nPress 'q' to exit and save current progress\n")
         print(f"Starting parsing with {max_workers} threads...\n")
+        if log_path:
+            print(f"Per-vocabulary log: {log_path}\n")
+        
+        display = self.display = ProgressDisplay("Extractor", total=total_count, log_path=log_path)
+        display.start()
         
         # Use ThreadPoolExecutor for concurrent parsing
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all tasks
             future_to_vocab = {
-                executor.submit(self.parse_vocabulary_page, vocab_id, category): (vocab_id, category)
+                executor.submit(self.parse_vocabulary_timed, vocab_id, category): (vocab_id, category)
                 for vocab_id, category in tasks
             }
             
@@ -879,27 +1010,135 @@ tables.push(table_{unique_id});
                 try:
                     vocab_data = future.result()
                     
+                    self.metrics.inc('vocabularies_total', result='ok' if vocab_data else 'failed')
                     if vocab_data:
                         with self.lock:
                             self.all_vocabularies.append(vocab_data)
                         
                         # Use simplified console formatting (no alignment)
-                        line = self.format_console_line(vocab_data)
-                        print(f"[{current}/{total_count}] ✓ {line}")
+                        with self.timed_stage('console'):
+                            line = self.format_console_line(vocab_data)
+                            display.inc(vocab_data.get('type') or vocab_data.get('category') or 'unknown')
+                            display.log(f"[{current}/{total_count}] ✓ {line}")
                     else:
-                        print(f"[{current}/{total_count}] ✗ {vocab_id}: Failed to parse")
+                        display.inc('failed')
+                        display.log(f"[{current}/{total_count}] ✗ {vocab_id}: Failed to parse")
                         
                 except Exception as e:
-                    print(f"[{current}/{total_count}] ✗ {vocab_id}: Error - {e}")
+                    self.metrics.inc('vocabularies_total', result='error')
+                    display.inc('failed')
+                    display.log(f"[{current}/{total_count}] ✗ {vocab_id}: Error - {e}")
                 
                 # Small delay to avoid overwhelming the server
                 time.sleep(delay / max_workers)
         
+        display.close()
+        self.display = None
         return self.all_vocabularies
 
 
+def dataset_updates_path(filepath) -> str:
+    """Update log written next to a dataset by incremental extraction."""
+    return str(Path(filepath).with_suffix('.updates.jsonl'))
+
+
+def load_dataset(filepath, content_store: Optional[str] = None) -> List[Dict]:
+    """Load vocabulary records saved by save_dataset, with incremental updates applied.
+    
+    Records whose content was moved to a content store only carry an entry
+    count; pass the store directory to read their content back.
+    """
+    vocabularies = []
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            vocabularies = json.load(f).get('vocabularies', [])
+    
+    updates_path = dataset_updates_path(filepath)
+    if os.path.exists(updates_path):
+        by_id = {vocab['id']: vocab for vocab in vocabularies}
+        with open(updates_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    # Partial-mode updates (e.g. counters) only overwrite the fields they carry
+                    vocab = json.loads(line)
+                    by_id.setdefault(vocab['id'], {}).update(vocab)
+        vocabularies = list(by_id.values())
+    
+    if content_store:
+        from KG_ContentStore import ContentStore
+        
+        store = ContentStore(content_store)
+        for vocab in vocabularies:
+            if 'content' not in vocab and vocab['id'] in store:
+                vocab['content'] = store.get(vocab['id'])
+    return vocabularies
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Parse Klavogonki vocabularies listed in valid_vocabularies.txt")
+    arg_parser.add_argument('--batch', action='store_true',
+                            help="Unattended run: no key listener, SIGINT/SIGTERM stop gracefully, --output-dir required")
+    arg_parser.add_argument('--output-dir', metavar='DIR',
+                            help="Directory for the dataset, reports, log, index, features and history (default: Desktop)")
+    arg_parser.add_argument('--workers', type=int, default=10, help="Number of parsing threads")
+    arg_parser.add_argument('--delay', type=float, default=0.5, help="Delay between results, spread across workers")
+    arg_parser.add_argument('--mode', choices=list(EXTRACTION_MODES), default='full',
+                            help="Fields to extract: full, metadata (no content/language) or counters only")
+    arg_parser.add_argument('--embed-report', action='store_true',
+                            help="Inline the gzipped report data in the HTML instead of a separate .data.js file")
+    arg_parser.add_argument('--content-index', metavar='PATH',
+                            help="Full-text index over content (default: <output dir>/klavogonki_content_index.json.gz)")
+    arg_parser.add_argument('--content-store', metavar='DIR',
+                            help="Keep content in a deduplicated compressed store instead of inline in the dataset")
+    arg_parser.add_argument('--history', metavar='DIR',
+                            help="Counter time series directory (default: <output dir>/klavogonki_counter_history)")
+    arg_parser.add_argument('--features', metavar='PATH',
+                            help="Typing-difficulty feature table (default: <output dir>/klavogonki_typing_features.npy)")
+    arg_parser.add_argument('--follow', metavar='QUEUE',
+                            help="Incrementally extract IDs approved by the scanner (handoff_queue.jsonl) instead of a full run")
+    arg_parser.add_argument('--dataset', metavar='PATH',
+                            help="Dataset that --follow and partial modes append to (default: <output dir>/klavogonki_vocabularies.json)")
+    arg_parser.add_argument('--progress-log', metavar='PATH', help="Per-vocabulary log file (default: <output dir>)")
+    arg_parser.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    arg_parser.add_argument('--metrics-snapshot', metavar='PATH', help="Write periodic JSON metrics snapshots to PATH")
+    arg_parser.add_argument('--metrics-interval', type=float, default=10, help="Seconds between metrics snapshots")
+    arg_parser.add_argument('--profile-report', metavar='PATH', help="Record per-stage/per-vocabulary timings and write a JSON report")
+    arg_parser.add_argument('--profile-slowest', type=int, default=20, metavar='N', help="Number of slowest vocabularies in the report")
+    arg_parser.add_argument('--profile-sample', metavar='PATH', help="Write a sampling profile of all threads (collapsed stacks)")
+    args = parse_args_with_config(arg_parser)
+    if args.batch and not args.output_dir:
+        arg_parser.error("--batch requires --output-dir")
+    return args
+
+
 def main():
+    args = parse_args()
+    output_dir = Path(args.output_dir) if args.output_dir else Path.home() / "Desktop"
+    if args.output_dir:
+        output_dir.mkdir(parents=True, exist_ok=True)
     parser = KlavogonkiVocabularyParser()
+    parser.output_directory = args.output_dir
+    if args.batch:
+        def stop():
+            parser.should_exit = True
+        
+        install_stop_handlers(stop)
+    parser.mode = args.mode
+    parser.configure_paths(output_dir, args.content_index, args.history, args.features)
+    parser.content_store_path = args.content_store
+    parser.metrics.start(args.metrics_port, args.metrics_snapshot, args.metrics_interval)
+    
+    if args.follow:
+        dataset_path = args.dataset or str(output_dir / "klavogonki_vocabularies.json")
+        try:
+            parser.follow_handoff(args.follow, dataset_path)
+        except KeyboardInterrupt:
+            print("\nStopped following")
+        return
+    
+    if args.profile_report or args.profile_sample:
+        parser.profiler = RunProfiler(slowest=args.profile_slowest, sample_path=args.profile_sample)
+        parser.profiler.start()
     
     print("Fetching vocabulary IDs...")
     vocab_ids = parser.fetch_vocabulary_ids()
@@ -910,13 +1149,45 @@ def main():
     print("\nStarting to parse vocabularies...")
     print("=" * 80)
     
-    vocabularies = parser.parse_all_vocabularies(delay=0.5)
+    log_path = args.progress_log or str(output_dir / "klavogonki_vocabularies.log")
+    vocabularies = parser.parse_all_vocabularies(delay=args.delay, max_workers=args.workers, log_path=log_path,
+                                                 interactive=not args.batch)
     
     print(f"\n{'='*80}")
     print(f"Parsing complete!")
     print(f"Successfully parsed: {len(vocabularies)}/{total} vocabularies")
     
-    parser.save_to_desktop(vocabularies)
+    memory = record_memory(vocabularies)
+    if memory['dict']:
+        saved = memory['dict'] - memory['compact']
+        print(f"Record memory: {memory['compact'] / 1048576:.1f} MB "
+              f"(dict layout {memory['dict'] / 1048576:.1f} MB, saved {saved / memory['dict']:.0%})")
+    
+    if args.mode == 'full':
+        parser.save_to_desktop(vocabularies, embed_report=args.embed_report)
+        # Prune only after a complete run, against the listed IDs rather than the parsed ones
+        retain_ids = None
+        if not parser.should_exit and vocab_ids:
+            retain_ids = {vocab_id for ids in vocab_ids.values() for vocab_id in ids}
+        parser.update_content_index(vocabularies, retain_ids=retain_ids)
+        parser.update_typing_features(vocabularies, retain_ids=retain_ids)
+    elif args.dataset:
+        # Refreshed fields are merged over the existing dataset by load_dataset
+        parser.append_to_dataset(vocabularies, args.dataset)
+        print(f"✓ {len(vocabularies)} записей ({args.mode}) добавлено к {args.dataset}")
+    else:
+        parser.save_dataset(vocabularies, str(output_dir / f"klavogonki_vocabularies_{args.mode}.json"))
+    
+    # Every mode carries the counters
+    parser.record_history(vocabularies)
+    
+    if args.metrics_snapshot:
+        parser.metrics.write_snapshot(args.metrics_snapshot)
+    
+    if parser.profiler:
+        parser.profiler.stop()
+        parser.profiler.print_summary()
+        parser.profiler.save(args.profile_report)
     
     # Display sample of results
     if vocabularies:
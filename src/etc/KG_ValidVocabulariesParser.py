@@ -6,16 +6,18 @@ import os
 import threading
 import queue
 import json
+import argparse
 from datetime import datetime
+import shutil
 from concurrent.futures import ThreadPoolExecutor
-import pyperclip
 
-# Selenium imports (Firefox)
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.firefox import GeckoDriverManager
+# Selenium, webdriver_manager, pyperclip and the page parser (bs4) are
+# imported where they are first needed, so scan-only runs start fast
+from KG_BatchConfig import install_stop_handlers, parse_args_with_config
+from KG_ModerationRules import ModerationRules, ACTIONS
+from KG_Metrics import Metrics
+from KG_ProgressDisplay import ProgressDisplay
+from KG_ReorderWindow import ReorderWindow
 
 # For reading single keypresses
 try:
@@ -44,27 +46,50 @@ class DirectoryManager:
                 return path
         return os.getcwd()
     
-    def load_saved_directory(self):
-        """Load the last used directory from config file"""
+    def load_config(self):
+        """Load the whole config file (empty if missing or unreadable)"""
         try:
             if os.path.exists(self.config_file):
                 with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    saved_dir = config.get('last_directory')
-                    if saved_dir and os.path.exists(saved_dir):
-                        return saved_dir
+                    return json.load(f)
         except Exception as e:
-            print(f"Could not load saved directory: {e}")
-        return None
-    
-    def save_directory(self, directory):
-        """Save the current directory to config file"""
+            print(f"Could not load config: {e}")
+        return {}
+
+    def update_config(self, **values):
+        """Merge values into the config file"""
         try:
-            config = {'last_directory': directory}
+            config = self.load_config()
+            config.update(values)
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
         except Exception as e:
-            print(f"Could not save directory preference: {e}")
+            print(f"Could not save config: {e}")
+
+    def load_saved_directory(self):
+        """Load the last used directory from config file"""
+        saved_dir = self.load_config().get('last_directory')
+        if saved_dir and os.path.exists(saved_dir):
+            return saved_dir
+        return None
+    
+    def save_directory(self, directory):
+        """Save the current directory to config file"""
+        self.update_config(last_directory=directory)
+
+    def get_geckodriver_path(self, pinned_path=None):
+        """Resolve geckodriver: pinned path, cached path, PATH, then download once and cache"""
+        for path in (pinned_path, os.environ.get('GECKODRIVER_PATH'), self.load_config().get('geckodriver_path')):
+            if path and os.path.exists(path):
+                return path
+
+        path = shutil.which('geckodriver')
+        if not path:
+            from webdriver_manager.firefox import GeckoDriverManager
+            print("Resolving geckodriver (network)...")
+            path = GeckoDriverManager().install()
+        self.update_config(geckodriver_path=path)
+        return path
     
     def get_working_directory(self):
         """Get the working directory (saved or default)"""
@@ -110,8 +135,85 @@ class DirectoryManager:
         return current_dir
 
 
+class DecisionLedger:
+    """Durable, append-only record of moderation decisions keyed by vocabulary ID.
+
+    Outcomes listed in expiry (seconds) only count as decided for that long:
+    a skipped vocabulary is private now but may be made public later.
+    """
+    def __init__(self, working_directory, expiry=None):
+        self.ledger_file = os.path.join(working_directory, "moderation_ledger.jsonl")
+        self.lock = threading.Lock()
+        self.decisions = {}
+        self.expiry = {"skipped": 7 * 86400} if expiry is None else expiry
+        self.load()
+
+    def load(self):
+        """Load decisions; later lines override earlier ones for the same ID"""
+        try:
+            if os.path.exists(self.ledger_file):
+                with open(self.ledger_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            entry = json.loads(line)
+                            self.decisions[entry["id"]] = entry
+        except Exception as e:
+            print(f"Could not load moderation ledger: {e}")
+
+    def seed(self, vocab_ids, reason):
+        """Mark IDs as approved in memory only (e.g. already in valid_vocabularies.txt)"""
+        for vocab_id in vocab_ids:
+            self.decisions.setdefault(vocab_id, {"id": vocab_id, "outcome": "approved", "reason": reason})
+
+    def get(self, vocab_id):
+        return self.decisions.get(vocab_id)
+
+    def __contains__(self, vocab_id):
+        entry = self.decisions.get(vocab_id)
+        return entry is not None and not self.expired(entry)
+
+    def expired(self, entry):
+        """True once a re-checkable decision is older than its expiry"""
+        ttl = self.expiry.get(entry["outcome"])
+        if ttl is None or "time" not in entry:
+            return False
+        return (datetime.now() - datetime.fromisoformat(entry["time"])).total_seconds() > ttl
+
+    def record(self, vocab_id, outcome, reason, vocab_type=None):
+        """Store a decision and append it to the ledger file immediately"""
+        entry = {
+            "id": vocab_id,
+            "outcome": outcome,
+            "reason": reason,
+            "type": vocab_type,
+            "time": datetime.now().isoformat(timespec='seconds')
+        }
+        with self.lock:
+            self.decisions[vocab_id] = entry
+            try:
+                with open(self.ledger_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except Exception as e:
+                print(f"Could not write moderation ledger: {e}")
+
+
 class StatusChecker:
-    def __init__(self, base_url, start_id=1, num_threads=20, working_directory=None):
+    # Status stored for IDs skipped because the ledger already has a decision
+    DECIDED = "decided"
+    # Outcome of candidates left for a human in batch mode (not written to the ledger)
+    DEFERRED = "deferred"
+    # Status of a probe that got no response (timeout, connection error)
+    PROBE_ERROR = "error"
+    # Transient statuses probed again before the result is handed to the collector
+    RETRY_STATUSES = (429, 500, 502, 503, 504, PROBE_ERROR)
+    PROBE_RETRIES = 3
+    # Polls in a row an ID may fail in watch mode before it is left to the scanner
+    WATCH_RETRIES = 3
+
+    def __init__(self, base_url, start_id=1, num_threads=20, working_directory=None, use_ledger=True, prefetch=3,
+                 geckodriver_path=None, extract_to=None, batch=False, end_id=None, window=1024,
+                 recheck_skipped=7):
         self.base_url = base_url
         self.found_vocabularies = {
             "words": [],
@@ -123,16 +225,36 @@ class StatusChecker:
         self.running = True
         self.successful_requests = 0
         self.num_threads = num_threads
-        self.current_id = start_id
         self.start_id = start_id
+        self.end_id = end_id
+        # Unattended: no browser, keypresses or clipboard; stopped by signals or end_id
+        self.batch = batch
         self.id_lock = threading.Lock()
-        self.results_lock = threading.Lock()
-        self.pending_results = {}
-        self.next_to_print = start_id
-        
+
         # Set working directory
         self.working_directory = working_directory or os.getcwd()
 
+        # IDs still failing at the end of earlier sessions and candidates deferred to
+        # watch_candidates.txt (batch mode, 'q', watcher) are scanned again before start_id
+        self.failed_ids = self.load_failed_ids()
+        self.pending_candidates = {int(vid) for vid in self.load_watch_candidates()}
+        self.rescan_ids = sorted({int(vid) for vid in self.failed_ids} | self.pending_candidates)
+        self.rescan_ids = [vid for vid in self.rescan_ids if vid < start_id]
+
+        # Results wait here until every lower ID is handled; workers block when it is full.
+        # The window is keyed by scan position, see id_at()
+        self.current_position = 0
+        self.results = ReorderWindow(0, window)
+        self.collector_thread = threading.Thread(target=self.collect_results, daemon=True)
+
+        # Decisions from previous sessions, checked before any request is made
+        self.ledger = DecisionLedger(self.working_directory, {"skipped": recheck_skipped * 86400})
+        self.use_ledger = use_ledger
+        self.ledger.seed(self.load_valid_ids(), "valid_vocabularies")
+
+        # Auto-moderation rules (moderation_rules.json in working directory)
+        self.rules = ModerationRules.load(self.working_directory)
+
         # Moderation queue
         self.moderation_queue = queue.Queue()
         self.moderation_thread = threading.Thread(target=self.moderate_results, daemon=True)
@@ -143,10 +265,46 @@ class StatusChecker:
         
         # Track if currently moderating to prevent duplicates
         self.currently_moderating = False
+        self.moderating_id = None
+        self.moderation_done = threading.Event()
+
+        # Number of upcoming candidates preloaded in background tabs
+        self.prefetch = prefetch
+
+        # Live counters, latency histograms and queue depths
+        self.metrics = Metrics("kg_scanner")
+        self.metrics.register("probes_total", "counter", "Vocabulary page probes by HTTP status")
+        self.metrics.register("probes_skipped_total", "counter", "IDs skipped because the ledger has a decision")
+        self.metrics.register("probe_seconds", "histogram", "Probe request latency")
+        self.metrics.register("in_flight", "gauge", "Probe requests in flight")
+        self.metrics.register("decisions_total", "counter", "Moderation decisions by outcome")
+        self.metrics.register("pending_results", "gauge", "Out-of-order results waiting to be processed")
+        self.metrics.register("blocked_workers", "gauge", "Workers waiting for room in the reorder window")
+        self.metrics.register("moderation_queue", "gauge", "Candidates waiting for moderation")
+        self.metrics.register("next_id", "gauge", "Next ID to be processed in order")
+        self.metrics.gauge_callback("pending_results", lambda: len(self.results))
+        self.metrics.gauge_callback("blocked_workers", lambda: self.results.blocked)
+        self.metrics.gauge_callback("moderation_queue", self.moderation_queue.qsize)
+        self.metrics.gauge_callback("next_id", lambda: self.id_at(self.results.head))
+
+        # Aggregated console progress, created by run() so watch mode leaves scan_progress.log alone
+        self.display = None
+
+        # Approved IDs are streamed to the extractor through this queue file
+        self.handoff_queue_path = os.path.join(self.working_directory, "handoff_queue.jsonl")
+        self.handoff_lock = threading.Lock()
+        self.extract_to = extract_to
+
+        # Browser is launched on the first candidate that needs a human
+        self.geckodriver_path = geckodriver_path
+        self.driver = None
+        self.main_handle = None
 
     def signal_handler(self, sig, frame):
         """Handle Ctrl+C gracefully and save log to file"""
         self.running = False
+        if self.display:
+            self.display.close()
         print(f"\n\nScript cancelled.")
         print(f"Successful requests: {self.successful_requests}")
         print(f"Saving found vocabularies to {self.working_directory}...")
@@ -154,24 +312,31 @@ class StatusChecker:
         print(f"Log saved successfully!")
         sys.exit(0)
 
-    def get_vocab_type_english(self, russian_type):
-        """Convert Russian vocabulary type to English key"""
-        type_mapping = {
-            "Слова": "words",
-            "Фразы": "phrases",
-            "Тексты": "texts",
-            "URL": "url",
-            "Книга": "books",
-            "Генератор": "generator"
-        }
-        return type_mapping.get(russian_type, "unknown")
+    def load_valid_ids(self):
+        """Load all IDs already present in valid_vocabularies.txt"""
+        log_file_path = os.path.join(self.working_directory, "valid_vocabularies.txt")
+        try:
+            if os.path.exists(log_file_path):
+                with open(log_file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                return {vid for ids in data.get("validVocabularies", {}).values() for vid in ids}
+        except Exception as e:
+            print(f"Could not load existing IDs: {e}")
+        return set()
 
     def format_id_as_bbcode(self, vocab_id):
         """Format a single ID as BBCode link"""
         return f'[url="{self.base_url}{vocab_id}/"]{vocab_id}[/url]'
 
-    def save_log(self):
+    def request_stop(self):
+        """Stop workers and moderation; run() then saves the log and returns"""
+        self.running = False
+        self.workers_paused.set()  # Release workers waiting on a moderation pause
+        self.results.close()
+
+    def save_log(self, copy_to_clipboard=True):
         """Save all logged vocabularies to working directory as JSON, preserving previous data"""
+        self.save_failed_ids()
         try:
             log_file_path = os.path.join(self.working_directory, "valid_vocabularies.txt")
 
@@ -226,9 +391,10 @@ class StatusChecker:
                 json.dump(output_data, f, ensure_ascii=False, indent=2)
 
             # Copy to clipboard
-            if clipboard_lines:
+            if clipboard_lines and copy_to_clipboard:
                 clipboard_text = '\n'.join(clipboard_lines)
                 try:
+                    import pyperclip
                     pyperclip.copy(clipboard_text)
                     print("📋 Summary copied to clipboard (BBCode format)!")
                 except Exception as e:
@@ -237,46 +403,39 @@ class StatusChecker:
         except Exception as e:
             print(f"Error saving log: {e}")
 
+    def id_at(self, position):
+        """Vocabulary ID at a scan position: the rescanned IDs first, then start_id onwards"""
+        if position < len(self.rescan_ids):
+            return self.rescan_ids[position]
+        return self.start_id + position - len(self.rescan_ids)
+
     def get_next_id(self):
-        """Get next vocabulary ID to check"""
+        """Get the next scan position and its vocabulary ID"""
         with self.id_lock:
-            if self.running:
-                vocab_id = self.current_id
-                self.current_id += 1
-                return vocab_id
+            vocab_id = self.id_at(self.current_position)
+            if self.running and (self.end_id is None or vocab_id <= self.end_id):
+                position = self.current_position
+                self.current_position += 1
+                return position, vocab_id
             return None
 
-    def process_result(self, vocab_id, status):
-        """Process result and print in order"""
-        with self.results_lock:
-            self.pending_results[vocab_id] = status
-
-            while self.next_to_print in self.pending_results and self.running and not self.currently_moderating:
-                current_id = self.next_to_print
-                current_status = self.pending_results[current_id]
-
-                if current_status == 200:
-                    url = f"{self.base_url}{current_id}"
-                    # Mark as moderating and pause workers
-                    self.currently_moderating = True
-                    self.workers_paused.clear()
-                    self.moderation_queue.put((current_id, url))
-                    print(f"moderation needed {current_id} - WORKERS PAUSED")
-                    # Break and wait for moderation to complete
-                    break
-                elif current_status in [404, 403]:
-                    print(f"absent {current_id}")
-                    del self.pending_results[current_id]
-                    self.next_to_print += 1
+    def process_result(self, position, status):
+        """Hand a result to the collector, waiting while the reorder window is full"""
+        self.results.put(position, status, lambda: self.running)
 
-    def worker_thread(self):
-        """Worker thread function"""
+    def create_session(self):
+        """Create an HTTP session with browser-like headers"""
         session = requests.Session()
         session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
                           'AppleWebKit/537.36 (KHTML, like Gecko) '
                           'Chrome/91.0.4472.124 Safari/537.36'
         })
+        return session
+
+    def worker_thread(self):
+        """Worker thread function"""
+        session = self.create_session()
 
         while self.running:
             # Wait if workers are paused
@@ -285,17 +444,24 @@ class StatusChecker:
             if not self.running:
                 break
                 
-            vocab_id = self.get_next_id()
-            if vocab_id is None:
+            next_id = self.get_next_id()
+            if next_id is None:
                 break
+            position, vocab_id = next_id
 
-            try:
-                url = f"{self.base_url}{vocab_id}"
-                response = session.get(url, timeout=2)
-                self.process_result(vocab_id, response.status_code)
+            # Already decided in an earlier session, no request needed
+            if self.use_ledger and vocab_id in self.ledger:
+                self.metrics.inc("probes_skipped_total")
+                self.process_result(position, self.DECIDED)
+                continue
 
-            except Exception:
-                self.process_result(vocab_id, 404)
+            status = self.probe_id(session, vocab_id, timeout=2)
+            for attempt in range(self.PROBE_RETRIES):
+                if status not in self.RETRY_STATUSES or not self.running:
+                    break
+                time.sleep(2 ** attempt)
+                status = self.probe_id(session, vocab_id, timeout=2)
+            self.process_result(position, status)
 
     def get_single_keypress(self):
         """Read a single keypress without requiring Enter"""
@@ -313,57 +479,107 @@ class StatusChecker:
             finally:
                 termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
 
-    def check_if_public(self, driver):
-        """Parse the page to check if vocabulary is public (Публичный: Да)"""
+    def approve(self, vocab_id, vocab_type):
+        """Add an approved vocabulary to the found list of its type"""
+        self.successful_requests += 1
+        if vocab_type in self.found_vocabularies:
+            self.found_vocabularies[vocab_type].append(vocab_id)
+        else:
+            self.found_vocabularies["unknown"] = self.found_vocabularies.get("unknown", [])
+            self.found_vocabularies["unknown"].append(vocab_id)
+        self.queue_handoff(vocab_id, vocab_type)
+
+    def queue_handoff(self, vocab_id, vocab_type):
+        """Append an approved ID to the handoff queue read by the extractor"""
+        entry = {"id": vocab_id, "type": vocab_type, "time": datetime.now().isoformat(timespec='seconds')}
+        with self.handoff_lock:
+            try:
+                with open(self.handoff_queue_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except Exception as e:
+                self.display.message(f"Could not queue {vocab_id} for extraction: {e}")
+
+    def run_extraction_handoff(self):
+        """Extract approved IDs in-process as soon as they are queued"""
+        from KG_ValidVocabulariesExtractor import KlavogonkiVocabularyParser
+
+        extractor = KlavogonkiVocabularyParser()
+        # Same defaults as the extractor CLI, next to the dataset
+        extractor.configure_paths(os.path.dirname(os.path.abspath(self.extract_to)))
+        extractor.follow_handoff(self.handoff_queue_path, self.extract_to, stop=lambda: not self.running)
+
+    def finish_moderation(self, vocab_id, outcome=None, reason=None, vocab_type=None, announce=True):
+        """Record the decision (if any) and resume ordered processing"""
+        if outcome and outcome != self.DEFERRED:
+            self.ledger.record(vocab_id, outcome, reason, vocab_type)
+            self.resolve_candidate(vocab_id)
+        self.metrics.inc("decisions_total", outcome=outcome or "error")
+
+        self.currently_moderating = False
+        self.moderating_id = None
+        self.moderation_done.set()  # The collector moves past this ID
+
+        self.workers_paused.set()  # Resume workers
+        if announce:
+            self.display.log(f"WORKERS RESUMED after {vocab_id}")
+        self.display.resume()
+
+    def upcoming_candidates(self, after_id, limit):
+        """IDs already probed as live that will need moderation after the current one"""
+        live_ids = (self.id_at(position) for position, status in self.results.items() if status == 200)
+        return [vid for vid in live_ids if vid > after_id][:limit]
+
+    def prefetch_tabs(self, driver, tabs, current_id):
+        """Open background tabs for the next queued candidates without blocking"""
+        for vid in self.upcoming_candidates(current_id, self.prefetch):
+            if len(tabs) >= self.prefetch:
+                break
+            if vid in tabs:
+                continue
+            handles = set(driver.window_handles)
+            driver.execute_script("window.open(arguments[0], '_blank');", f"{self.base_url}{vid}")
+            new_handles = set(driver.window_handles) - handles
+            if new_handles:
+                tabs[vid] = new_handles.pop()
+
+    def wait_for_page(self, driver, timeout=10):
+        """Wait until the vocabulary details are in the DOM instead of sleeping"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+
         try:
-            # Find all <dt> elements
-            dt_elements = driver.find_elements(By.TAG_NAME, "dt")
-            
-            for dt in dt_elements:
-                dt_text = dt.text.strip().replace('\n', '').replace('\t', '')
-                if "Публичный:" in dt_text or "Публичный" in dt_text:
-                    # Get the next sibling <dd> element
-                    dd = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                    value = dd.text.strip().split('\n')[0].strip()
-                    
-                    if value == "Да":
-                        return True
-                    elif value == "Нет":
-                        return False
-            
-            # If we can't find the field, assume it's public
-            return True
-            
-        except Exception as e:
-            print(f"Error parsing public status: {e}")
-            # On error, assume public to allow manual moderation
-            return True
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "user-content"))
+            )
+        except TimeoutException:
+            self.display.message("Page load timed out, parsing what is available")
 
-    def get_vocab_type(self, driver):
-        """Extract vocabulary type from the page"""
+    def release_tab(self, driver, tabs, vocab_id, main_handle):
+        """Close the prefetch tab of a decided candidate and return to the main tab"""
+        handle = tabs.pop(vocab_id, None)
         try:
-            dt_elements = driver.find_elements(By.TAG_NAME, "dt")
-            
-            for dt in dt_elements:
-                dt_text = dt.text.strip().replace('\n', '').replace('\t', '')
-                if "Тип словаря:" in dt_text or "Тип словаря" in dt_text:
-                    dd = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                    # Get only the first line, ignore the note div
-                    dd_text = dd.text.strip().split('\n')[0].strip()
-                    russian_type = dd_text
-                    return self.get_vocab_type_english(russian_type)
-            
-            return "unknown"
-            
-        except Exception as e:
-            print(f"Error parsing vocabulary type: {e}")
-            return "unknown"
+            if handle and handle != main_handle:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(main_handle)
+        except Exception:
+            pass
+
+    def launch_browser(self):
+        """Start Firefox with the persistent moderation profile"""
+        from selenium import webdriver
+        from selenium.webdriver.firefox.service import Service
+        from selenium.webdriver.firefox.options import Options
 
-    def moderate_results(self):
-        """Run Selenium moderation loop with Firefox"""
         options = Options()
         options.add_argument("--width=1200")
         options.add_argument("--height=800")
+        # Return once the DOM is ready, and keep prefetch tabs in the background
+        options.page_load_strategy = 'eager'
+        options.set_preference("dom.disable_open_during_load", False)
+        options.set_preference("browser.tabs.loadDivertedInBackground", True)
 
         # Configure persistent Firefox profile
         # Option 1: Create profile on Desktop
@@ -379,130 +595,103 @@ class StatusChecker:
         options.add_argument('-profile')
         options.add_argument(profile_path)
 
-        driver = webdriver.Firefox(
-            service=Service(GeckoDriverManager().install()),
-            options=options
-        )
+        driver_path = DirectoryManager().get_geckodriver_path(self.geckodriver_path)
+        self.driver = webdriver.Firefox(service=Service(driver_path), options=options)
+        self.main_handle = self.driver.current_window_handle
+
+    def quit_browser(self):
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+
+    def fetch_page(self, session, url, retries=3):
+        """Fetch candidate HTML for the rules without involving the browser.
+
+        403, 429, 5xx and network errors are retried with backoff; the last
+        error is raised once every attempt failed.
+        """
+        for attempt in range(retries + 1):
+            try:
+                response = session.get(url, timeout=15)
+                if response.status_code in (403,) + self.RETRY_STATUSES and attempt < retries:
+                    time.sleep(2 ** attempt)
+                    continue
+                response.raise_for_status()
+                return response.content
+            except requests.exceptions.RequestException:
+                if attempt >= retries or not self.running:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def moderate_results(self):
+        """Apply moderation rules; run Firefox only for candidates that need a human"""
+        from KG_ValidVocabulariesExtractor import KlavogonkiVocabularyParser
+
+        page_parser = KlavogonkiVocabularyParser()
+        tabs = {}
 
         while self.running:
             try:
                 vocab_id, url = self.moderation_queue.get(timeout=1)
             except queue.Empty:
                 continue
+            self.moderating_id = vocab_id
 
             try:
-                driver.get(url)
-                
-                # Wait a moment for page to load
-                time.sleep(0.5)
-                
-                # Check if vocabulary is public
-                is_public = self.check_if_public(driver)
-                
-                if not is_public:
-                    print(f"not public {vocab_id}")
-                    
-                    # Resume processing after auto-skip
-                    with self.results_lock:
-                        if vocab_id in self.pending_results:
-                            del self.pending_results[vocab_id]
-                        self.next_to_print += 1
-                        self.currently_moderating = False
-                    
-                    self.workers_paused.set()  # Resume workers
-                    print("WORKERS RESUMED\n")
-                    
-                    # Trigger processing of any pending results
-                    self.process_pending_results()
+                # Parse the page and let the rules decide
+                try:
+                    html = self.fetch_page(page_parser.session, url)
+                except requests.exceptions.RequestException as e:
+                    # The rules cannot see the page; a human (or a later session) decides
+                    self.display.message(f"Could not fetch {vocab_id} for the rules: {e}")
+                    html = None
+                if html is not None:
+                    record = page_parser.parse_vocabulary_html(vocab_id, "unknown", html, mode="full")
+                    fields = self.rules.fields(record)
+                    action, rule_name = self.rules.evaluate(fields)
+                else:
+                    fields = dict.fromkeys(("type", "language", "entries", "author", "name"))
+                    action, rule_name = "human", "fetch_failed"
+                vocab_type = fields["type"] or "unknown"
+
+                if action != "human":
+                    outcome = ACTIONS[action]
+                    detail = f"{outcome} {vocab_id}: {vocab_type} ({rule_name}, {fields['entries']} entries)"
+                    if outcome == "approved":
+                        self.approve(vocab_id, vocab_type)
+                        self.display.approval(detail)
+                    else:
+                        self.display.log(detail)
+                    self.display.inc(outcome)
+                    self.finish_moderation(vocab_id, outcome, rule_name, vocab_type)
                     continue
-                
-                # Get vocabulary type
-                vocab_type = self.get_vocab_type(driver)
-                
-                # Auto-skip URL type vocabularies
-                if vocab_type == "url":
-                    print(f"skipped {vocab_id}: url")
-                    
-                    # Resume processing after auto-skip
-                    with self.results_lock:
-                        if vocab_id in self.pending_results:
-                            del self.pending_results[vocab_id]
-                        self.next_to_print += 1
-                        self.currently_moderating = False
-                    
-                    self.workers_paused.set()  # Resume workers
-                    print("WORKERS RESUMED\n")
-                    
-                    # Trigger processing of any pending results
-                    self.process_pending_results()
+
+                if self.batch:
+                    # Leave it for an interactive session, like the watcher does
+                    self.defer_candidate(vocab_id)
+                    self.display.log(f"deferred {vocab_id}: {vocab_type} ({rule_name})")
+                    self.display.inc(self.DEFERRED)
+                    self.finish_moderation(vocab_id, self.DEFERRED, rule_name, vocab_type, announce=False)
                     continue
+
+                if self.driver is None:
+                    self.launch_browser()
+                driver = self.driver
+
+                # Switch to the preloaded tab if there is one, otherwise load in the main tab
+                if vocab_id in tabs:
+                    driver.switch_to.window(tabs[vocab_id])
+                else:
+                    driver.get(url)
+                self.wait_for_page(driver)
+                self.prefetch_tabs(driver, tabs, vocab_id)
                 
-                # Auto-approve books type vocabularies if they have at least 10 pieces
-                if vocab_type == "books":
-                    try:
-                        # Find the table with words/pieces
-                        user_content = driver.find_element(By.CLASS_NAME, "user-content")
-                        words_div = user_content.find_element(By.CLASS_NAME, "words")
-                        table = words_div.find_element(By.TAG_NAME, "table")
-                        rows = table.find_elements(By.TAG_NAME, "tr")
-                        
-                        # Count rows (excluding header if present)
-                        row_count = len(rows)
-                        
-                        if row_count >= 10:
-                            self.successful_requests += 1
-                            self.found_vocabularies["books"].append(vocab_id)
-                            print(f"approved {vocab_id}: books ({row_count} pieces)")
-                            
-                            # Resume processing after auto-approval
-                            with self.results_lock:
-                                if vocab_id in self.pending_results:
-                                    del self.pending_results[vocab_id]
-                                self.next_to_print += 1
-                                self.currently_moderating = False
-                            
-                            self.workers_paused.set()  # Resume workers
-                            print("WORKERS RESUMED\n")
-                            
-                            # Trigger processing of any pending results
-                            self.process_pending_results()
-                            continue
-                        else:
-                            print(f"skipped {vocab_id}: books (only {row_count} pieces, need at least 10)")
-                            
-                            # Resume processing after auto-skip
-                            with self.results_lock:
-                                if vocab_id in self.pending_results:
-                                    del self.pending_results[vocab_id]
-                                self.next_to_print += 1
-                                self.currently_moderating = False
-                            
-                            self.workers_paused.set()  # Resume workers
-                            print("WORKERS RESUMED\n")
-                            
-                            # Trigger processing of any pending results
-                            self.process_pending_results()
-                            continue
-                            
-                    except Exception as e:
-                        print(f"Error checking book pieces for {vocab_id}: {e}")
-                        print(f"Skipping {vocab_id} due to error")
-                        
-                        # Resume processing after error
-                        with self.results_lock:
-                            if vocab_id in self.pending_results:
-                                del self.pending_results[vocab_id]
-                            self.next_to_print += 1
-                            self.currently_moderating = False
-                        
-                        self.workers_paused.set()
-                        self.process_pending_results()
-                        continue
-                
-                # If public and not URL/books type, show for manual moderation
+                # No rule decided, show for manual moderation
+                self.display.pause()
                 print(f"\n{'='*60}")
                 print(f"Moderating {vocab_id} → {url}")
-                print(f"Type: {vocab_type}")
+                print(f"Type: {vocab_type} | Language: {fields['language']} | Entries: {fields['entries']}")
+                print(f"Author: {fields['author']} | Name: {fields['name']}")
                 print(f"{'='*60}")
                 print("Press [SPACE] to approve, [s] to skip, [q] to quit:")
 
@@ -511,95 +700,304 @@ class StatusChecker:
                     
                     if choice == 'q':
                         print("\nq - Exiting...")
-                        self.running = False
-                        driver.quit()
-                        self.save_log()
-                        print(f"Successful requests: {self.successful_requests}")
-                        print(f"Log saved to {self.working_directory}!")
-                        sys.exit(0)
+                        # Kept for a later session; run() saves the log once everything has stopped
+                        self.defer_candidate(vocab_id)
+                        self.finish_moderation(vocab_id, self.DEFERRED, "quit", vocab_type, announce=False)
+                        self.request_stop()
+                        break
                     elif choice == ' ':
-                        self.successful_requests += 1
-                        if vocab_type in self.found_vocabularies:
-                            self.found_vocabularies[vocab_type].append(vocab_id)
-                        else:
-                            self.found_vocabularies["unknown"] = self.found_vocabularies.get("unknown", [])
-                            self.found_vocabularies["unknown"].append(vocab_id)
+                        self.approve(vocab_id, vocab_type)
                         print(f"SPACE - ➕ Approved {vocab_id} ({vocab_type})")
-                        
-                        # Resume processing after moderation
-                        with self.results_lock:
-                            if vocab_id in self.pending_results:
-                                del self.pending_results[vocab_id]
-                            self.next_to_print += 1
-                            self.currently_moderating = False
-                        
-                        self.workers_paused.set()  # Resume workers
-                        print("WORKERS RESUMED\n")
-                        
-                        # Trigger processing of any pending results
-                        self.process_pending_results()
+                        self.display.approval(f"approved {vocab_id}: {vocab_type} (manual)")
+                        self.display.inc("approved")
+                        self.finish_moderation(vocab_id, "approved", "manual", vocab_type)
                         break
                     elif choice == 's':
                         print(f"s - ❌ Skipped {vocab_id}: {vocab_type}")
-                        
-                        # Resume processing after moderation
-                        with self.results_lock:
-                            if vocab_id in self.pending_results:
-                                del self.pending_results[vocab_id]
-                            self.next_to_print += 1
-                            self.currently_moderating = False
-                        
-                        self.workers_paused.set()  # Resume workers
-                        print("WORKERS RESUMED\n")
-                        
-                        # Trigger processing of any pending results
-                        self.process_pending_results()
+                        self.display.log(f"rejected {vocab_id}: {vocab_type} (manual)")
+                        self.display.inc("rejected")
+                        self.finish_moderation(vocab_id, "rejected", "manual", vocab_type)
                         break
                         
             except Exception as e:
-                print(f"Error moderating {vocab_id}: {e}")
-                # Resume workers even on error
-                with self.results_lock:
-                    if vocab_id in self.pending_results:
-                        del self.pending_results[vocab_id]
-                    self.next_to_print += 1
-                    self.currently_moderating = False
-                self.workers_paused.set()
-                self.process_pending_results()
-
-        driver.quit()
-
-    def process_pending_results(self):
-        """Process any pending results after moderation completes"""
-        with self.results_lock:
-            while self.next_to_print in self.pending_results and self.running and not self.currently_moderating:
-                current_id = self.next_to_print
-                current_status = self.pending_results[current_id]
-
-                if current_status == 200:
-                    url = f"{self.base_url}{current_id}"
-                    self.currently_moderating = True
-                    self.workers_paused.clear()
-                    self.moderation_queue.put((current_id, url))
-                    print(f"moderation needed {current_id} - WORKERS PAUSED")
+                self.display.message(f"Error moderating {vocab_id}: {e}")
+                # Keep the candidate for a later session instead of dropping it, and resume workers
+                self.defer_candidate(vocab_id)
+                self.display.inc(self.DEFERRED)
+                self.finish_moderation(vocab_id, self.DEFERRED, "error", announce=False)
+            finally:
+                if self.driver:
+                    self.release_tab(self.driver, tabs, vocab_id, self.main_handle)
+
+        self.quit_browser()
+
+    def finish_pending_moderation(self, timeout=30):
+        """Let a decision in progress finish, then defer candidates nobody decided on"""
+        self.moderation_thread.join(timeout)
+        pending = []
+        if self.moderation_thread.is_alive() and self.moderating_id is not None:
+            pending.append(self.moderating_id)
+        while True:
+            try:
+                pending.append(self.moderation_queue.get_nowait()[0])
+            except queue.Empty:
+                break
+        for vocab_id in pending:
+            self.defer_candidate(vocab_id)
+            print(f"Candidate {vocab_id} deferred to watch_candidates.txt")
+
+    def defer_candidate(self, vocab_id):
+        """Queue a candidate in watch_candidates.txt for later manual moderation"""
+        with self.handoff_lock:
+            candidates = self.load_watch_candidates()
+            candidates.setdefault(str(vocab_id), datetime.now().isoformat(timespec='seconds'))
+            self.save_watch_candidates(candidates)
+            self.pending_candidates.add(vocab_id)
+
+    def collect_results(self):
+        """Handle results in ID order; the only consumer of the reorder window.
+
+        Logging and queueing happen here, outside the window lock, so workers
+        only ever hold it to store a status.
+        """
+        while self.running:
+            item = self.results.peek(timeout=0.1)
+            if item is None:
+                continue
+            position, current_status = item
+            current_id = self.id_at(position)
+
+            if current_status == 200:
+                url = f"{self.base_url}{current_id}"
+                # Mark as moderating and pause workers until the decision is in
+                self.currently_moderating = True
+                self.moderation_done.clear()
+                self.workers_paused.clear()
+                self.moderation_queue.put((current_id, url))
+                self.display.log(f"moderation needed {current_id} - WORKERS PAUSED")
+                while self.running and not self.moderation_done.wait(0.1):
+                    pass
+                if not self.running:
                     break
-                elif current_status in [404, 403]:
-                    print(f"absent {current_id}")
-                    del self.pending_results[current_id]
-                    self.next_to_print += 1
+            elif current_status == self.DECIDED:
+                self.display.log(f"decided {current_id}: {self.ledger.get(current_id)['outcome']}")
+                self.display.inc("decided")
+            elif current_status in [404, 403]:
+                self.display.log(f"absent {current_id} ({current_status})")
+                self.display.inc("absent" if current_status == 404 else str(current_status))
+            else:
+                # Still failing after retries; saved to failed_ids.txt and rescanned next session
+                self.display.log(f"failed {current_id} ({current_status}), queued for rescan")
+                self.display.inc(str(current_status))
+
+            if current_status in (403, 404, self.DECIDED):
+                # Gone or decided in the meantime, nothing left to moderate
+                self.resolve_candidate(current_id)
+            with self.handoff_lock:
+                if current_status in (200, 403, 404, self.DECIDED):
+                    self.failed_ids.pop(str(current_id), None)
+                else:
+                    self.failed_ids[str(current_id)] = datetime.now().isoformat(timespec='seconds')
+            self.results.advance()
+
+            if self.end_id is not None and self.id_at(self.results.head) > self.end_id:
+                # Every ID of a bounded scan has been handled
+                self.request_stop()
+
+    def resolve_candidate(self, vocab_id):
+        """Remove a decided candidate from watch_candidates.txt"""
+        if vocab_id not in self.pending_candidates:
+            return
+        with self.handoff_lock:
+            self.pending_candidates.discard(vocab_id)
+            candidates = self.load_watch_candidates()
+            if candidates.pop(str(vocab_id), None) is not None:
+                self.save_watch_candidates(candidates)
+
+    def load_watch_candidates(self):
+        """Load queued watcher candidates from working directory"""
+        candidates_path = os.path.join(self.working_directory, "watch_candidates.txt")
+        try:
+            if os.path.exists(candidates_path):
+                with open(candidates_path, 'r', encoding='utf-8') as f:
+                    return json.load(f).get("candidates", {})
+        except Exception as e:
+            print(f"Could not load watch candidates: {e}")
+        return {}
+
+    def save_watch_candidates(self, candidates):
+        """Save queued watcher candidates to working directory"""
+        candidates_path = os.path.join(self.working_directory, "watch_candidates.txt")
+        try:
+            with open(candidates_path, 'w', encoding='utf-8') as f:
+                json.dump({"candidates": candidates}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Could not save watch candidates: {e}")
+
+    def load_failed_ids(self):
+        """Load IDs whose probes kept failing in earlier sessions"""
+        failed_path = os.path.join(self.working_directory, "failed_ids.txt")
+        try:
+            if os.path.exists(failed_path):
+                with open(failed_path, 'r', encoding='utf-8') as f:
+                    return json.load(f).get("failed", {})
+        except Exception as e:
+            print(f"Could not load failed IDs: {e}")
+        return {}
+
+    def save_failed_ids(self):
+        """Save IDs still failing so the next session rescans them"""
+        failed_path = os.path.join(self.working_directory, "failed_ids.txt")
+        with self.handoff_lock:
+            failed = dict(sorted(self.failed_ids.items(), key=lambda item: int(item[0])))
+        try:
+            with open(failed_path, 'w', encoding='utf-8') as f:
+                json.dump({"failed": failed}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Could not save failed IDs: {e}")
+
+    def probe_id(self, session, vocab_id, timeout=5):
+        """Return the HTTP status of a vocabulary page (PROBE_ERROR on network errors)"""
+        try:
+            with self.metrics.timed("probe_seconds", in_flight="in_flight"):
+                status = session.get(f"{self.base_url}{vocab_id}", timeout=timeout).status_code
+            self.metrics.inc("probes_total", status=status)
+            return status
+        except Exception:
+            self.metrics.inc("probes_total", status=self.PROBE_ERROR)
+            return self.PROBE_ERROR
+
+    def watch(self, poll_interval=60, min_window=20, max_window=200, max_interval=600, max_gap=None):
+        """Poll just beyond the highest known ID and queue vocabularies as they go live.
+
+        When a whole poll is absent (404), the next ones also probe a window
+        further ahead, up to max_gap IDs past the frontier, so a gap of deleted IDs
+        wider than the window cannot stall the watcher. The frontier only
+        moves once something live is found, and not past an ID whose probe
+        failed until it has failed WATCH_RETRIES polls in a row; such IDs go
+        to failed_ids.txt for the next scan.
+        """
+        def stop_watching(sig, frame):
+            self.running = False
+
+        signal.signal(signal.SIGINT, stop_watching)
+        if hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, stop_watching)
+
+        candidates = self.load_watch_candidates()
+        frontier = max([self.start_id] + [int(vid) + 1 for vid in candidates])
+        window = min_window
+        interval = poll_interval
+        max_gap = max_gap or 10 * max_window
+        scout = 0  # Start of the look-ahead window past an absent gap, 0 when not scouting
+        failures = {}  # Polls in a row each unresolved ID has failed
+        sessions = queue.Queue()
+
+        print(f"Watching from ID {frontier} (window {min_window}-{max_window}, "
+              f"interval {poll_interval}-{max_interval}s)")
+        print(f"Candidates are queued in {os.path.join(self.working_directory, 'watch_candidates.txt')}")
+        print("Press Ctrl+C to stop")
+        print("-" * 50)
+
+        def probe(vocab_id):
+            try:
+                session = sessions.get_nowait()
+            except queue.Empty:
+                session = self.create_session()
+            try:
+                return vocab_id, self.probe_id(session, vocab_id)
+            finally:
+                sessions.put(session)
+
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            while self.running:
+                size = window
+                ids = list(range(frontier, frontier + size))
+                if scout:
+                    ids += range(scout, scout + size)
+                statuses = dict(executor.map(probe, ids))
+                live_ids = sorted(vid for vid, status in statuses.items() if status == 200)
+                forbidden = sum(1 for status in statuses.values() if status == 403)
+                # Errors are not absences: the frontier stays at the first ID that could not be probed
+                unresolved = sorted(vid for vid, status in statuses.items() if status not in (200, 403, 404))
+                timestamp = datetime.now().isoformat(timespec='seconds')
+                failures = {vid: failures.get(vid, 0) + 1 for vid in unresolved}
+                given_up = [vid for vid in unresolved if failures[vid] >= self.WATCH_RETRIES]
+                if given_up:
+                    # Left to the next scan so one broken ID cannot pin the frontier
+                    for vid in given_up:
+                        self.failed_ids[str(vid)] = timestamp
+                        del failures[vid]
+                    self.save_failed_ids()
+                    unresolved = [vid for vid in unresolved if vid in failures]
+                    print(f"[{timestamp}] gave up on {', '.join(map(str, given_up))}, queued in failed_ids.txt")
+
+                if live_ids:
+                    new_ids = [vid for vid in live_ids
+                               if str(vid) not in candidates and not (self.use_ledger and vid in self.ledger)]
+                    for vid in new_ids:
+                        candidates[str(vid)] = timestamp
+                        print(f"[{timestamp}] new candidate {vid} → {self.base_url}{vid}")
+                    if new_ids:
+                        self.save_watch_candidates(candidates)
+                    frontier = min([live_ids[-1] + 1] + [vid for vid in unresolved if vid < live_ids[-1]])
+                    scout = 0
+                    window = min(max_window, window * 2)
+                    interval = poll_interval
+                else:
+                    window = max(min_window, window // 2)
+                    interval = min(max_interval, interval * 1.5)
+                    if not unresolved and not forbidden:
+                        # Every probe was a definite 404: look further ahead next time,
+                        # starting over at the frontier after max_gap
+                        scout = (scout or frontier) + size
+                        if scout >= frontier + max_gap:
+                            scout = 0
+
+                if unresolved:
+                    print(f"[{timestamp}] {len(unresolved)}/{len(statuses)} probes failed, retried next poll")
+
+                if forbidden:
+                    # Server is throttling us, slow down regardless of hits
+                    interval = min(max_interval, interval * 2)
+                    print(f"[{timestamp}] 403 on {forbidden}/{len(statuses)} probes, backing off to {interval:.0f}s")
+
+                deadline = time.time() + interval
+                while self.running and time.time() < deadline:
+                    time.sleep(0.5)
+
+        self.save_watch_candidates(candidates)
+        print(f"\nWatcher stopped at ID {frontier}, {len(candidates)} candidates queued")
 
     def run(self):
         """Main function using multithreading with ordered output"""
-        signal.signal(signal.SIGINT, self.signal_handler)
+        if self.batch:
+            install_stop_handlers(self.request_stop)
+        else:
+            signal.signal(signal.SIGINT, self.signal_handler)
 
         print(f"Starting {self.num_threads} threads for sequential vocabulary checking")
-        print(f"Starting from ID: {self.start_id}")
+        print(f"Starting from ID: {self.start_id}" + (f" to {self.end_id}" if self.end_id else ""))
+        if self.rescan_ids:
+            print(f"Re-checking {len(self.rescan_ids)} failed IDs and deferred candidates from earlier sessions first")
         print(f"Working directory: {self.working_directory}")
-        print("Press Ctrl+C to stop and save log")
+        print("Send SIGINT/SIGTERM to stop and save log" if self.batch else "Press Ctrl+C to stop and save log")
         print("-" * 50)
 
-        # Start moderation thread
+        # Per-ID detail goes to scan_progress.log
+        self.display = ProgressDisplay(
+            "Scanner",
+            log_path=os.path.join(self.working_directory, "scan_progress.log"),
+            extra=lambda: f"next ID {self.id_at(self.results.head)}"
+        )
+
+        # Start moderation, ordered result collection and progress display
         self.moderation_thread.start()
+        self.collector_thread.start()
+        self.display.start()
+
+        if self.extract_to:
+            threading.Thread(target=self.run_extraction_handoff, daemon=True).start()
 
         try:
             with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
@@ -610,6 +1008,14 @@ class StatusChecker:
         except KeyboardInterrupt:
             self.signal_handler(signal.SIGINT, None)
 
+        # Reached when a batch run is stopped, 'q' is pressed or a bounded scan is complete
+        self.request_stop()
+        self.finish_pending_moderation()
+        self.display.close()
+        print(f"\nSuccessful requests: {self.successful_requests}")
+        print(f"Saving found vocabularies to {self.working_directory}...")
+        self.save_log(copy_to_clipboard=not self.batch)
+
 
 def find_max_id_from_file(file_path):
     """Find the maximum ID from existing JSON file"""
@@ -669,17 +1075,86 @@ def get_start_id(working_directory):
             sys.exit(0)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scan Klavogonki vocabulary IDs and moderate new ones")
+    parser.add_argument('--watch', action='store_true',
+                        help="Run non-interactively, polling beyond the highest known ID for new vocabularies")
+    parser.add_argument('--batch', action='store_true',
+                        help="Unattended scan: no prompts, browser or clipboard; candidates needing a human are "
+                             "deferred to watch_candidates.txt; SIGINT/SIGTERM stop gracefully (needs --directory)")
+    parser.add_argument('--start-id', type=int, help="First ID to check (default: after the highest known ID)")
+    parser.add_argument('--end-id', type=int, help="Stop after this ID has been handled")
+    parser.add_argument('--threads', type=int, default=10, help="Number of probing threads")
+    parser.add_argument('--reorder-window', type=int, default=1024,
+                        help="Results buffered ahead of the next ID before workers wait")
+    parser.add_argument('--directory', help="Working directory (skips the directory prompt)")
+    parser.add_argument('--prefetch', type=int, default=3,
+                        help="Number of upcoming candidates preloaded in background tabs")
+    parser.add_argument('--extract-to', metavar='DATASET',
+                        help="Extract approved vocabularies in-process and append them to this dataset")
+    parser.add_argument('--geckodriver', help="Pinned geckodriver path (no network lookup)")
+    parser.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument('--metrics-snapshot', metavar='PATH', help="Write periodic JSON metrics snapshots to PATH")
+    parser.add_argument('--metrics-interval', type=float, default=10, help="Seconds between metrics snapshots")
+    parser.add_argument('--ignore-ledger', action='store_true',
+                        help="Re-check IDs that already have a moderation decision")
+    parser.add_argument('--recheck-skipped', type=float, default=7, metavar='DAYS',
+                        help="Re-check private (skipped) vocabularies after this many days")
+    parser.add_argument('--interval', type=float, default=60, help="Watcher base poll interval in seconds")
+    parser.add_argument('--max-interval', type=float, default=600, help="Watcher poll interval ceiling in seconds")
+    parser.add_argument('--window', type=int, default=20, help="Watcher minimum number of IDs probed per poll")
+    parser.add_argument('--max-window', type=int, default=200, help="Watcher maximum number of IDs probed per poll")
+    parser.add_argument('--max-gap', type=int,
+                        help="Watcher look-ahead past absent IDs before starting over (default: 10 × --max-window)")
+    args = parse_args_with_config(parser)
+    if args.batch and not args.directory:
+        parser.error("--batch requires --directory")
+    return args
+
+
+def next_start_id(working_directory):
+    """ID after the highest one in valid_vocabularies.txt (1 if there is none)"""
+    json_file_path = os.path.join(working_directory, "valid_vocabularies.txt")
+    max_id = (find_max_id_from_file(json_file_path) if os.path.exists(json_file_path) else None) or 0
+    return max_id + 1
+
+
 if __name__ == "__main__":
     BASE_URL = "https://klavogonki.ru/vocs/"
-    NUM_THREADS = 10
+
+    args = parse_args()
+    NUM_THREADS = args.threads
 
     # Initialize directory manager
     dir_manager = DirectoryManager()
-    working_directory = dir_manager.prompt_for_directory()
+
+    if args.watch:
+        working_directory = args.directory or dir_manager.get_working_directory()
+        checker = StatusChecker(BASE_URL, args.start_id or next_start_id(working_directory), NUM_THREADS,
+                                working_directory, use_ledger=not args.ignore_ledger,
+                                recheck_skipped=args.recheck_skipped)
+        checker.metrics.start(args.metrics_port, args.metrics_snapshot, args.metrics_interval)
+        checker.watch(args.interval, args.window, args.max_window, args.max_interval, args.max_gap)
+        sys.exit(0)
+
+    if args.directory:
+        working_directory = args.directory
+    else:
+        working_directory = dir_manager.prompt_for_directory()
     
     # Get starting ID based on files in working directory
-    start_id = get_start_id(working_directory)
+    if args.start_id:
+        start_id = args.start_id
+    elif args.batch:
+        start_id = next_start_id(working_directory)
+    else:
+        start_id = get_start_id(working_directory)
     
     # Create and run checker with working directory
-    checker = StatusChecker(BASE_URL, start_id, NUM_THREADS, working_directory)
+    checker = StatusChecker(BASE_URL, start_id, NUM_THREADS, working_directory,
+                            use_ledger=not args.ignore_ledger, prefetch=args.prefetch,
+                            geckodriver_path=args.geckodriver, extract_to=args.extract_to,
+                            batch=args.batch, end_id=args.end_id, window=args.reorder_window,
+                            recheck_skipped=args.recheck_skipped)
+    checker.metrics.start(args.metrics_port, args.metrics_snapshot, args.metrics_interval)
     checker.run()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import brotli  # Optional, smaller shards for clients that accept br
+except ImportError:
+    brotli = None
+
+
+def minify(data) -> bytes:
+    """Serialize to compact UTF-8 JSON without whitespace."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def load_valid_vocabularies(path: str) -> Dict[str, List[int]]:
+    """Load validVocabularies from a valid_vocabularies.txt file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('validVocabularies', {})
+
+
+class ArtifactPublisher:
+    """Writes per-type minified/compressed shards, a hashed manifest and deltas."""
+    def __init__(self, output_directory: str):
+        self.output_directory = output_directory
+        self.manifest_path = os.path.join(output_directory, 'manifest.json')
+
+    def load_manifest(self) -> Optional[Dict]:
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Could not load previous manifest: {e}")
+        return None
+
+    def load_shard(self, filename: str) -> List[int]:
+        try:
+            with open(os.path.join(self.output_directory, filename), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return []
+
+    def write(self, filename: str, payload: bytes) -> Dict:
+        """Write a shard with its compressed variants and return its manifest entry."""
+        with open(os.path.join(self.output_directory, filename), 'wb') as f:
+            f.write(payload)
+        # mtime=0 keeps the gzip bytes stable between runs for unchanged shards
+        gz_payload = gzip.compress(payload, compresslevel=9, mtime=0)
+        with open(os.path.join(self.output_directory, f"{filename}.gz"), 'wb') as f:
+            f.write(gz_payload)
+
+        entry = {
+            'file': filename,
+            'sha256': hashlib.sha256(payload).hexdigest(),
+            'bytes': len(payload),
+            'gzip': {'file': f"{filename}.gz", 'bytes': len(gz_payload)}
+        }
+        if brotli:
+            br_payload = brotli.compress(payload, quality=11)
+            with open(os.path.join(self.output_directory, f"{filename}.br"), 'wb') as f:
+                f.write(br_payload)
+            entry['brotli'] = {'file': f"{filename}.br", 'bytes': len(br_payload)}
+        return entry
+
+    def publish(self, valid_vocabularies: Dict[str, List[int]], with_delta: bool = True) -> Dict:
+        """Publish shards for every type; the version only changes when content does."""
+        os.makedirs(self.output_directory, exist_ok=True)
+        previous = self.load_manifest()
+        previous_shards = previous.get('shards', {}) if previous else {}
+        previous_ids = {vtype: set(self.load_shard(entry['file'])) for vtype, entry in previous_shards.items()}
+
+        shards = {}
+        changed = []
+        for vtype, ids in sorted(valid_vocabularies.items()):
+            ids = sorted(set(ids))
+            entry = self.write(f"{vtype}.json", minify(ids))
+            entry['count'] = len(ids)
+            shards[vtype] = entry
+            if previous_shards.get(vtype, {}).get('sha256') != entry['sha256']:
+                changed.append(vtype)
+        removed_types = [vtype for vtype in previous_shards if vtype not in shards]
+
+        if previous and not changed and not removed_types:
+            print(f"No changes since version {previous['version']}, manifest kept")
+            return previous
+
+        version = previous['version'] + 1 if previous else 1
+        manifest = {
+            'version': version,
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'total': sum(entry['count'] for entry in shards.values()),
+            'shards': shards
+        }
+
+        if previous and with_delta:
+            delta = {'from': previous['version'], 'to': version, 'added': {}, 'removed': {}}
+            for vtype in changed + removed_types:
+                new_ids = set(valid_vocabularies.get(vtype, []))
+                old_ids = previous_ids.get(vtype, set())
+                if new_ids - old_ids:
+                    delta['added'][vtype] = sorted(new_ids - old_ids)
+                if old_ids - new_ids:
+                    delta['removed'][vtype] = sorted(old_ids - new_ids)
+            manifest['delta'] = self.write(f"delta-{previous['version']}-{version}.json", minify(delta))
+            manifest['delta'].update({'from': previous['version'], 'to': version})
+
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Publish sharded, compressed validVocabularies artifacts")
+    arg_parser.add_argument('input', nargs='?', default='valid_vocabularies.txt', help="valid_vocabularies.txt path")
+    arg_parser.add_argument('--output', default='artifacts', help="Output directory for shards and manifest")
+    arg_parser.add_argument('--no-delta', action='store_true', help="Do not write a delta against the previous version")
+    args = arg_parser.parse_args()
+
+    valid_vocabularies = load_valid_vocabularies(args.input)
+    manifest = ArtifactPublisher(args.output).publish(valid_vocabularies, with_delta=not args.no_delta)
+
+    source_bytes = os.path.getsize(args.input)
+    print(f"Version {manifest['version']}: {manifest['total']} IDs in {len(manifest['shards'])} shards")
+    for vtype, entry in manifest['shards'].items():
+        print(f"  {vtype}: {entry['count']} IDs, {entry['bytes']} B, gzip {entry['gzip']['bytes']} B")
+    gz_total = sum(entry['gzip']['bytes'] for entry in manifest['shards'].values())
+    print(f"Source {source_bytes} B → {gz_total} B gzipped ({gz_total / source_bytes:.1%})")
+    if 'delta' in manifest:
+        print(f"Delta {manifest['delta']['from']} → {manifest['delta']['to']}: {manifest['delta']['gzip']['bytes']} B gzipped")
+
+
+if __name__ == "__main__":
+    main()
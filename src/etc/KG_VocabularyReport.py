@@ -0,0 +1,490 @@
+import argparse
+import base64
+import gzip
+import json
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_TYPE_ORDER = ['words', 'phrases', 'texts', 'books', 'generator']
+DEFAULT_TYPE_NAMES = {
+    'words': 'Слова',
+    'phrases': 'Фразы',
+    'texts': 'Тексты',
+    'books': 'Книга',
+    'generator': 'Генератор'
+}
+UNKNOWN_AUTHOR = 'Неизвестный автор'
+
+
+def build_report_data(data: List, type_order: List[str] = DEFAULT_TYPE_ORDER,
+                      type_names: Dict[str, str] = DEFAULT_TYPE_NAMES) -> Dict:
+    """Columnar, dictionary-encoded report dataset.
+
+    Rows are ordered by author (most vocabularies first), type and ID so the
+    page can group them without sorting. Repeating strings (authors, types,
+    languages, dates) are stored once and referenced by index.
+    """
+    author_counts = Counter(vocab.get('author') or UNKNOWN_AUTHOR for vocab in data)
+    authors = sorted(author_counts, key=lambda author: (-author_counts[author], author))
+    author_rank = {author: i for i, author in enumerate(authors)}
+
+    types = [vtype for vtype in type_order if any(vocab.get('type') == vtype for vocab in data)]
+    types += sorted({vocab.get('type') or 'unknown' for vocab in data} - set(types))
+    type_rank = {vtype: i for i, vtype in enumerate(types)}
+
+    def sort_key(vocab):
+        return (author_rank[vocab.get('author') or UNKNOWN_AUTHOR], type_rank[vocab.get('type') or 'unknown'], vocab['id'])
+
+    languages, created = {}, {}
+    columns = {name: [] for name in (
+        'id', 'author', 'type', 'name', 'language', 'rating', 'users', 'comments', 'created', 'public', 'entries'
+    )}
+    for vocab in sorted(data, key=sort_key):
+        columns['id'].append(vocab['id'])
+        columns['author'].append(author_rank[vocab.get('author') or UNKNOWN_AUTHOR])
+        columns['type'].append(type_rank[vocab.get('type') or 'unknown'])
+        columns['name'].append(vocab.get('name') or 'N/A')
+        columns['language'].append(languages.setdefault(vocab.get('language') or 'N/A', len(languages)))
+        columns['rating'].append(vocab.get('rating') or 0)
+        columns['users'].append(vocab.get('users_count') or 0)
+        columns['comments'].append(vocab.get('comments_count') or 0)
+        columns['created'].append(created.setdefault(vocab.get('created') or 'N/A', len(created)))
+        columns['public'].append(1 if vocab.get('is_public') else 0)
+        columns['entries'].append(vocab.get('entries', len(vocab.get('content') or [])))
+
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'total': len(data),
+        'authors': authors,
+        'types': [type_names.get(vtype, vtype) for vtype in types],
+        'languages': list(languages),
+        'created': list(created),
+        'columns': columns
+    }
+
+
+def encode_report_data(report_data: Dict) -> bytes:
+    return json.dumps(report_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_report(data: List, html_path, embed: bool = False, type_order: List[str] = DEFAULT_TYPE_ORDER,
+                 type_names: Dict[str, str] = DEFAULT_TYPE_NAMES) -> Optional[Path]:
+    """Write the HTML report; returns the external data file, if one was written.
+
+    By default the dataset goes to <name>.data.js next to the page (loaded with
+    a script tag, so it also works from file://). With embed=True it is
+    gzipped and inlined as base64 instead, giving a single self-contained file.
+    """
+    html_path = Path(html_path)
+    report_data = build_report_data(data, type_order, type_names)
+    payload = encode_report_data(report_data)
+
+    data_path = None
+    if embed:
+        encoded = base64.b64encode(gzip.compress(payload, compresslevel=9, mtime=0)).decode('ascii')
+        data_tag = f'<script type="application/octet-stream" id="report-data">{encoded}</script>'
+    else:
+        data_path = html_path.with_suffix('.data.js')
+        with open(data_path, 'wb') as f:
+            f.write(b'window.KG_REPORT_DATA=' + payload + b';\n')
+        data_tag = f'<script src="{data_path.name}"></script>'
+
+    page = (REPORT_TEMPLATE
+            .replace('{{TOTAL}}', str(report_data['total']))
+            .replace('{{AUTHORS}}', str(len(report_data['authors'])))
+            .replace('{{DATA}}', data_tag))
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return data_path
+
+
+REPORT_TEMPLATE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Словари Клавогонок</title>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/tabulator-tables@6.3.0/dist/css/tabulator.min.css">
+    <style>
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 20px;
+            min-height: 100vh;
+        }
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 15px;
+            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+            padding: 40px;
+        }
+        .header {
+            text-align: center;
+            margin-bottom: 30px;
+            padding-bottom: 20px;
+            border-bottom: 3px solid #667eea;
+        }
+        .header h1 {
+            color: #667eea;
+            font-size: 2.5em;
+            margin-bottom: 15px;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
+        }
+        .header .stats {
+            font-size: 1.2em;
+            color: #555;
+            margin-top: 10px;
+        }
+        .search-container {
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            gap: 15px;
+            margin: 0 0 20px;
+            padding: 15px;
+            background: white;
+            border-radius: 10px;
+            box-shadow: 0 4px 10px rgba(0,0,0,0.1);
+        }
+        .search-container select,
+        .search-container input {
+            padding: 12px 20px;
+            border: 2px solid #e9ecef;
+            border-radius: 25px;
+            font-size: 1em;
+            transition: all 0.3s ease;
+            outline: none;
+        }
+        .search-container select:focus,
+        .search-container input:focus {
+            border-color: #667eea;
+            box-shadow: 0 0 0 3px rgba(102,126,234,0.1);
+        }
+        .search-container .matches {
+            color: #6c757d;
+            min-width: 120px;
+        }
+        .tabulator {
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+        }
+        .tabulator .tabulator-header {
+            background: linear-gradient(135deg, #667eea, #764ba2);
+            color: white;
+        }
+        .tabulator .tabulator-header .tabulator-col {
+            background: transparent;
+            text-align: left;
+            font-weight: 600;
+            font-size: 0.95em;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }
+        .tabulator .tabulator-row .tabulator-cell {
+            padding: 10px 12px;
+            font-size: 0.95em;
+        }
+        .tabulator .tabulator-row.tabulator-group.tabulator-group-level-0 {
+            background: linear-gradient(135deg, #667eea, #764ba2);
+            color: white;
+            font-size: 1.1em;
+            padding: 10px;
+        }
+        .tabulator .tabulator-row.tabulator-group.tabulator-group-level-1 {
+            background: #f1f3f5;
+            border-left: 4px solid #667eea;
+            color: #495057;
+        }
+        .tabulator-group .count {
+            opacity: 0.8;
+            font-weight: normal;
+        }
+        .vocab-id {
+            color: #667eea;
+            text-decoration: none;
+            font-weight: 600;
+        }
+        .vocab-id:hover {
+            text-decoration: underline;
+        }
+        .rating {
+            color: #ffc107;
+            font-weight: 600;
+        }
+        .rating::after {
+            content: ' ⭐';
+        }
+        .badge {
+            padding: 4px 10px;
+            border-radius: 12px;
+            font-size: 0.85em;
+            font-weight: 600;
+            display: inline-block;
+        }
+        .badge-open {
+            background: #d4edda;
+            color: #155724;
+        }
+        .badge-closed {
+            background: #f8d7da;
+            color: #721c24;
+        }
+        .lang-badge {
+            padding: 4px 10px;
+            border-radius: 12px;
+            font-size: 0.85em;
+            font-weight: 600;
+            background: #e7f5ff;
+            color: #1864ab;
+        }
+        .stat {
+            color: #6c757d;
+            font-size: 0.9em;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📚 Словари Клавогонок</h1>
+            <div class="stats">
+                <strong>Всего распарсено:</strong> {{TOTAL}} словарей от {{AUTHORS}} авторов
+            </div>
+        </div>
+        <div class="search-container">
+            <select id="searchMode">
+                <option value="author">Поиск по автору</option>
+                <option value="id">Поиск по ID</option>
+                <option value="name">Поиск по названию</option>
+                <option value="language">Поиск по языку</option>
+                <option value="rating">Поиск по рейтингу</option>
+                <option value="users">Поиск по используют</option>
+                <option value="comments">Поиск по комментариям</option>
+                <option value="created">Поиск по создан</option>
+                <option value="access">Поиск по доступу</option>
+                <option value="entries">Поиск по записям</option>
+            </select>
+            <input type="text" id="searchInput" placeholder="Введите поисковый запрос...">
+            <span class="matches" id="matches"></span>
+        </div>
+        <div id="vocabularies"></div>
+    </div>
+    {{DATA}}
+    <script src="https://cdn.jsdelivr.net/npm/tabulator-tables@6.3.0/dist/js/tabulator.min.js"></script>
+    <script>
+        async function loadReportData() {
+            if (window.KG_REPORT_DATA) return window.KG_REPORT_DATA;
+            const encoded = document.getElementById('report-data').textContent;
+            const bytes = Uint8Array.from(atob(encoded), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            return JSON.parse(await new Response(stream).text());
+        }
+
+        // Lookup structures are built on first use of each search mode
+        class SearchIndex {
+            constructor(data) {
+                this.data = data;
+                this.columns = data.columns;
+                this.count = data.columns.id.length;
+                this.cache = {};
+            }
+
+            // Rows per exact column value (dictionary codes or numbers)
+            codeRows(column) {
+                const key = 'codes:' + column;
+                if (!this.cache[key]) {
+                    const rows = new Map();
+                    this.columns[column].forEach((code, row) => {
+                        if (!rows.has(code)) rows.set(code, []);
+                        rows.get(code).push(row);
+                    });
+                    this.cache[key] = rows;
+                }
+                return this.cache[key];
+            }
+
+            // Trigram postings over lowercased names
+            trigrams() {
+                if (!this.cache.trigrams) {
+                    const postings = new Map();
+                    const names = this.columns.name.map(name => name.toLowerCase());
+                    names.forEach((name, row) => {
+                        const seen = new Set();
+                        for (let i = 0; i + 3 <= name.length; i++) {
+                            const gram = name.slice(i, i + 3);
+                            if (seen.has(gram)) continue;
+                            seen.add(gram);
+                            if (!postings.has(gram)) postings.set(gram, []);
+                            postings.get(gram).push(row);
+                        }
+                    });
+                    this.cache.trigrams = {postings, names};
+                }
+                return this.cache.trigrams;
+            }
+
+            matchDictionary(column, values, term) {
+                const rows = this.codeRows(column);
+                const result = [];
+                values.forEach((value, code) => {
+                    if (value.toLowerCase().includes(term) && rows.has(code)) result.push(...rows.get(code));
+                });
+                return result;
+            }
+
+            matchName(term) {
+                const {postings, names} = this.trigrams();
+                let candidates = null;
+                if (term.length >= 3) {
+                    // Verify only the rows of the rarest trigram of the term
+                    for (let i = 0; i + 3 <= term.length; i++) {
+                        const rows = postings.get(term.slice(i, i + 3)) || [];
+                        if (!candidates || rows.length < candidates.length) candidates = rows;
+                    }
+                } else {
+                    candidates = names.keys();
+                }
+                const result = [];
+                for (const row of candidates) {
+                    if (names[row].includes(term)) result.push(row);
+                }
+                return result;
+            }
+
+            search(mode, term) {
+                const numeric = {id: 'id', rating: 'rating', users: 'users', comments: 'comments', entries: 'entries'};
+                if (mode in numeric) {
+                    // Substring match on the digits, so "12" also finds 1234
+                    const result = [];
+                    this.codeRows(numeric[mode]).forEach((rows, value) => {
+                        if (String(value).includes(term)) result.push(...rows);
+                    });
+                    return result;
+                }
+                if (mode === 'author') return this.matchDictionary('author', this.data.authors, term);
+                if (mode === 'language') return this.matchDictionary('language', this.data.languages, term);
+                if (mode === 'created') return this.matchDictionary('created', this.data.created, term);
+                if (mode === 'name') return this.matchName(term);
+                if (mode === 'access') {
+                    const wanted = [];
+                    if ('открытый'.includes(term)) wanted.push(1);
+                    if ('закрытый'.includes(term)) wanted.push(0);
+                    return wanted.flatMap(flag => this.codeRows('public').get(flag) || []);
+                }
+                return [];
+            }
+        }
+
+        function buildRows(data) {
+            const c = data.columns;
+            const rows = new Array(c.id.length);
+            for (let i = 0; i < rows.length; i++) {
+                rows[i] = {
+                    i: i,
+                    id: c.id[i],
+                    author: data.authors[c.author[i]],
+                    type: data.types[c.type[i]],
+                    name: c.name[i],
+                    language: data.languages[c.language[i]],
+                    rating: c.rating[i],
+                    users_count: c.users[i],
+                    comments_count: c.comments[i],
+                    created: data.created[c.created[i]],
+                    is_public: c.public[i] === 1,
+                    access_text: c.public[i] === 1 ? 'Открытый' : 'Закрытый',
+                    entries: c.entries[i]
+                };
+            }
+            return rows;
+        }
+
+        document.addEventListener('DOMContentLoaded', async () => {
+            const data = await loadReportData();
+            const index = new SearchIndex(data);
+            const searchInput = document.getElementById('searchInput');
+            const searchMode = document.getElementById('searchMode');
+            const matches = document.getElementById('matches');
+            let mask = null;
+
+            const table = new Tabulator('#vocabularies', {
+                data: buildRows(data),
+                height: '75vh',
+                layout: 'fitColumns',
+                groupBy: ['author', 'type'],
+                groupStartOpen: [false, true],  // Authors expand on click; rows render only for open groups
+                groupHeader: [
+                    (value, count) => `👤 ${value} <span class="count">(${count} словарей)</span>`,
+                    (value, count) => `📖 ${value} <span class="count">(${count} шт.)</span>`
+                ],
+                columns: [
+                    {title: 'ID', field: 'id', formatter: cell => `<a href="https://klavogonki.ru/vocs/${cell.getValue()}/" target="_blank" class="vocab-id">${cell.getValue()}</a>`},
+                    {title: 'Название', field: 'name', widthGrow: 3, formatter: cell => { const val = cell.getValue(); return `<strong title="${val}">${val.length > 60 ? val.slice(0, 57) + '...' : val}</strong>`; }},
+                    {title: 'Язык', field: 'language', formatter: cell => `<span class="lang-badge">${cell.getValue()}</span>`},
+                    {title: 'Рейтинг', field: 'rating', formatter: cell => `<span class="rating">${cell.getValue()}</span>`},
+                    {title: 'Используют', field: 'users_count', cssClass: 'stat'},
+                    {title: 'Комментариев', field: 'comments_count', cssClass: 'stat'},
+                    {title: 'Создан', field: 'created', cssClass: 'stat'},
+                    {title: 'Доступ', field: 'access_text', formatter: cell => `<span class="badge ${cell.getRow().getData().is_public ? 'badge-open' : 'badge-closed'}">${cell.getValue()}</span>`},
+                    {title: 'Записей', field: 'entries', cssClass: 'stat'}
+                ]
+            });
+
+            function filterContent() {
+                const term = searchInput.value.toLowerCase().trim();
+                if (!term) {
+                    mask = null;
+                    matches.textContent = '';
+                    table.setGroupStartOpen([false, true]);
+                    table.clearFilter();
+                    return;
+                }
+                const rows = index.search(searchMode.value, term);
+                mask = new Uint8Array(index.count);
+                rows.forEach(row => mask[row] = 1);
+                matches.textContent = `${rows.length} найдено`;
+                // Small result sets are shown expanded
+                table.setGroupStartOpen(rows.length <= 500 ? [true, true] : [false, true]);
+                table.setFilter(row => mask[row.i] === 1);
+            }
+
+            let timer = null;
+            searchInput.addEventListener('input', () => {
+                clearTimeout(timer);
+                timer = setTimeout(filterContent, 150);
+            });
+            searchMode.addEventListener('change', filterContent);
+        });
+    </script>
+</body>
+</html>
+"""
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Build the HTML vocabulary report from an extracted dataset")
+    arg_parser.add_argument('dataset', help="JSON dataset written by the extractor")
+    arg_parser.add_argument('--output', help="HTML report path (default: dataset name with .html)")
+    arg_parser.add_argument('--embed', action='store_true', help="Inline the gzipped dataset instead of writing .data.js")
+    args = arg_parser.parse_args()
+
+    from KG_ValidVocabulariesExtractor import load_dataset
+
+    vocabularies = load_dataset(args.dataset)
+    html_path = Path(args.output) if args.output else Path(args.dataset).with_suffix('.html')
+    data_path = write_report(vocabularies, html_path, embed=args.embed)
+    print(f"✓ HTML файл сохранен в {html_path}")
+    if data_path:
+        print(f"✓ Данные отчета сохранены в {data_path}")
+
+
+if __name__ == "__main__":
+    main()
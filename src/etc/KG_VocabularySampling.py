@@ -0,0 +1,111 @@
+import argparse
+import os
+import random
+from typing import Dict, List
+
+import numpy as np
+
+from KG_VocabularyArtifacts import ArtifactPublisher, minify
+from KG_VocabularyTable import VocabularyTable
+
+# Alias thresholds are stored as integers out of PROBABILITY_SCALE so the
+# client can compare them against Math.random() * PROBABILITY_SCALE
+PROBABILITY_SCALE = 65536
+
+
+def parse_weights(specs: List[str]) -> Dict[str, float]:
+    """Parse column=exponent pairs, e.g. ['rating=1', 'users_count=0.5']."""
+    weights = {}
+    for spec in specs:
+        column, _, exponent = spec.partition('=')
+        if column not in VocabularyTable.numeric_columns or column == 'id':
+            raise ValueError(f"Unknown weight column: {column}")
+        weights[column] = float(exponent or 1)
+    return weights
+
+
+def compute_weights(table: VocabularyTable, weights: Dict[str, float]) -> np.ndarray:
+    """Weight of every row: product of (1 + value) ** exponent over the weight columns."""
+    result = np.ones(len(table), dtype=np.float64)
+    for column, exponent in weights.items():
+        values = np.maximum(table.columns[column].astype(np.float64), 0)
+        result *= np.power(1 + values, exponent)
+    return result
+
+
+def build_alias_table(weights: np.ndarray) -> Dict[str, List[int]]:
+    """Vose's alias method: O(n) construction, O(1) weighted pick."""
+    count = len(weights)
+    scaled = weights * count / weights.sum()
+    prob = [0] * count
+    alias = list(range(count))
+    small = [i for i in range(count) if scaled[i] < 1]
+    large = [i for i in range(count) if scaled[i] >= 1]
+
+    while small and large:
+        low = small.pop()
+        high = large.pop()
+        prob[low] = int(round(scaled[low] * PROBABILITY_SCALE))
+        alias[low] = high
+        scaled[high] -= 1 - scaled[low]
+        (small if scaled[high] < 1 else large).append(high)
+    for i in small + large:
+        prob[i] = PROBABILITY_SCALE
+    return {'prob': prob, 'alias': alias}
+
+
+def build_sampling_tables(table: VocabularyTable, weights: Dict[str, float]) -> Dict:
+    """Alias tables per type and per type/language pair."""
+    row_weights = compute_weights(table, weights)
+    type_codes = table.columns['type_code']
+    language_codes = table.columns['language_code']
+    groups = {}
+
+    for vtype, rows in table.group_indices('type').items():
+        groups[f"{vtype}/*"] = rows
+        for code in np.unique(language_codes[rows]):
+            language = table.categories['language'][code]
+            groups[f"{vtype}/{language}"] = rows[language_codes[rows] == code]
+
+    tables = {}
+    for key, rows in sorted(groups.items()):
+        rows = rows[np.argsort(table.columns['id'][rows], kind='stable')]
+        entry = build_alias_table(row_weights[rows])
+        entry['ids'] = table.columns['id'][rows].tolist()
+        tables[key] = entry
+
+    return {
+        'scale': PROBABILITY_SCALE,
+        'weights': weights,
+        'tables': tables
+    }
+
+
+def sample(entry: Dict, rng: random.Random = random) -> int:
+    """Pick one ID from an alias table (same steps the userscript would take)."""
+    i = rng.randrange(len(entry['ids']))
+    if rng.random() * PROBABILITY_SCALE < entry['prob'][i]:
+        return entry['ids'][i]
+    return entry['ids'][entry['alias'][i]]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Build weighted random-selection tables from an extracted dataset")
+    arg_parser.add_argument('dataset', help="JSON dataset written by the extractor, or a saved .npz table")
+    arg_parser.add_argument('--output', default='artifacts', help="Directory for sampling.json(.gz)")
+    arg_parser.add_argument('--weight', action='append', default=[], metavar='COLUMN=EXPONENT',
+                            help="Weight factor (1 + COLUMN) ** EXPONENT, repeatable (default rating=1)")
+    args = arg_parser.parse_args()
+
+    weights = parse_weights(args.weight or ['rating=1'])
+    table = VocabularyTable.load(args.dataset)
+    sampling = build_sampling_tables(table, weights)
+
+    os.makedirs(args.output, exist_ok=True)
+    entry = ArtifactPublisher(args.output).write('sampling.json', minify(sampling))
+    print(f"✓ {len(sampling['tables'])} sampling tables for {len(table)} vocabularies "
+          f"({entry['bytes']} B, gzip {entry['gzip']['bytes']} B) saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
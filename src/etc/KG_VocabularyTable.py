@@ -0,0 +1,168 @@
+import argparse
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from KG_ValidVocabulariesExtractor import load_dataset
+
+
+class VocabularyTable:
+    """Columnar, NumPy-backed table over extracted vocabulary records."""
+
+    numeric_columns = {
+        'id': np.int64,
+        'rating': np.int16,
+        'users_count': np.int32,
+        'history_count': np.int32,
+        'comments_count': np.int32,
+        'entries': np.int32,
+    }
+    categorical_columns = {
+        'type': 'unknown',
+        'language': 'Неизвестно',
+        'author': 'Неизвестный автор',
+        'category': 'unknown',
+    }
+
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.categories = categories
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'VocabularyTable':
+        """Build the table in a single pass over vocabulary records."""
+        raw = {name: [] for name in list(cls.numeric_columns) + list(cls.categorical_columns) + ['is_public']}
+        for vocab in records:
+            raw['id'].append(vocab['id'])
+            raw['rating'].append(vocab.get('rating') or 0)
+            raw['users_count'].append(vocab.get('users_count') or 0)
+            raw['history_count'].append(vocab.get('history_count') or 0)
+            raw['comments_count'].append(vocab.get('comments_count') or 0)
+            raw['entries'].append(vocab.get('entries', len(vocab.get('content') or [])))
+            raw['is_public'].append(bool(vocab.get('is_public')))
+            for name, default in cls.categorical_columns.items():
+                raw[name].append(vocab.get(name) or default)
+
+        columns = {name: np.asarray(raw[name], dtype=dtype) for name, dtype in cls.numeric_columns.items()}
+        columns['is_public'] = np.asarray(raw['is_public'], dtype=bool)
+        categories = {}
+        for name in cls.categorical_columns:
+            values, codes = np.unique(np.asarray(raw[name], dtype=object), return_inverse=True)
+            categories[name] = values
+            columns[f'{name}_code'] = codes.astype(np.int32)
+        return cls(columns, categories)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'VocabularyTable':
+        """Load from a JSON dataset (save_dataset) or a saved .npz table."""
+        if str(filepath).endswith('.npz'):
+            with np.load(filepath, allow_pickle=True) as archive:
+                columns = {key[4:]: archive[key] for key in archive.files if key.startswith('col_')}
+                categories = {key[4:]: archive[key] for key in archive.files if key.startswith('cat_')}
+            return cls(columns, categories)
+        return cls.from_records(load_dataset(filepath))
+
+    def save(self, filepath: str):
+        """Save columns and category dictionaries to a compressed .npz file."""
+        arrays = {f'col_{name}': values for name, values in self.columns.items()}
+        arrays.update({f'cat_{name}': values for name, values in self.categories.items()})
+        np.savez_compressed(filepath, **arrays)
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    def decode(self, name: str, codes: np.ndarray) -> List[str]:
+        """Translate category codes back to their string values."""
+        return self.categories[name][codes].tolist()
+
+    def group_indices(self, name: str) -> Dict[str, np.ndarray]:
+        """Row indices per category value, rows kept in their original order."""
+        codes = self.columns[f'{name}_code']
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        groups = np.split(order, boundaries)
+        return {self.categories[name][codes[group[0]]]: group for group in groups if len(group)}
+
+    def author_totals(self) -> List[Dict]:
+        """Per-author vocabulary count and counter sums, largest authors first."""
+        codes = self.columns['author_code']
+        size = len(self.categories['author'])
+        counts = np.bincount(codes, minlength=size)
+        users = np.bincount(codes, weights=self.columns['users_count'], minlength=size)
+        comments = np.bincount(codes, weights=self.columns['comments_count'], minlength=size)
+        entries = np.bincount(codes, weights=self.columns['entries'], minlength=size)
+        ratings = np.bincount(codes, weights=self.columns['rating'], minlength=size)
+
+        order = np.lexsort((np.arange(size), -counts))
+        return [
+            {
+                'author': self.categories['author'][code],
+                'vocabularies': int(counts[code]),
+                'users_count': int(users[code]),
+                'comments_count': int(comments[code]),
+                'entries': int(entries[code]),
+                'mean_rating': round(float(ratings[code] / counts[code]), 2)
+            }
+            for code in order if counts[code]
+        ]
+
+    def rating_distribution(self, by: str = 'type') -> Dict[str, List[int]]:
+        """Histogram of ratings (0-10) for every value of a categorical column."""
+        codes = self.columns[f'{by}_code']
+        ratings = np.clip(self.columns['rating'], 0, 10)
+        matrix = np.zeros((len(self.categories[by]), 11), dtype=np.int64)
+        np.add.at(matrix, (codes, ratings), 1)
+        return {value: matrix[i].tolist() for i, value in enumerate(self.categories[by])}
+
+    def top_n_per_type(self, n: int = 10, by: str = 'users_count') -> Dict[str, List[int]]:
+        """IDs of the top N vocabularies of every type, ranked by a numeric column."""
+        codes = self.columns['type_code']
+        order = np.lexsort((self.columns['id'], -self.columns[by].astype(np.int64), codes))
+        sorted_codes = codes[order]
+        starts = np.searchsorted(sorted_codes, np.arange(len(self.categories['type'])))
+        ends = np.searchsorted(sorted_codes, np.arange(len(self.categories['type'])), side='right')
+        return {
+            self.categories['type'][code]: self.columns['id'][order[start:min(end, start + n)]].tolist()
+            for code, (start, end) in enumerate(zip(starts, ends)) if end > start
+        }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Columnar analytics over an extracted vocabulary dataset")
+    arg_parser.add_argument('dataset', help="JSON dataset written by the extractor, or a saved .npz table")
+    arg_parser.add_argument('--save', metavar='PATH', help="Save the columnar table to a .npz file")
+    arg_parser.add_argument('--top', type=int, default=10, help="Number of top vocabularies per type")
+    arg_parser.add_argument('--by', default='users_count', help="Numeric column used for the top-N ranking")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    table = VocabularyTable.load(args.dataset)
+    print(f"Loaded {len(table)} vocabularies in {time.perf_counter() - start:.3f}s")
+
+    if args.save:
+        table.save(args.save)
+        print(f"✓ Table saved to {args.save}")
+
+    start = time.perf_counter()
+    authors = table.author_totals()
+    distribution = table.rating_distribution()
+    top = table.top_n_per_type(args.top, args.by)
+    print(f"Aggregations computed in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"\nTop authors ({len(authors)} total):")
+    for row in authors[:10]:
+        print(f"  {row['author']}: {row['vocabularies']} словарей, "
+              f"используют {row['users_count']}, средний рейтинг {row['mean_rating']}")
+
+    print("\nRating distribution by type (0-10):")
+    for vtype, counts in distribution.items():
+        print(f"  {vtype}: {counts}")
+
+    print(f"\nTop {args.top} per type by {args.by}:")
+    for vtype, ids in top.items():
+        print(f"  {vtype}: {ids}")
+
+
+if __name__ == "__main__":
+    main()